@@ -0,0 +1,103 @@
+"""
+Benchmark: IVR turn latency under heavy database load
+Runs IVR turns on the event loop every few milliseconds while full-list
+and stats queries run, once calling DatabaseService directly (blocking
+the loop) and once through AsyncDatabaseService, and reports p50/p99.
+
+Usage: python benchmarks/bench_async_db.py [rows]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Also moves into a scratch directory before the services are imported
+from bench_query_plans import seed
+
+from services.database_service import DatabaseService
+from services.async_database_service import AsyncDatabaseService
+from services.ivr_controller import process_ivr_input
+
+
+TURN_INTERVAL = 0.005
+HEAVY_QUERIES = 4
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile in milliseconds"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+async def ivr_probe(stop: asyncio.Event, latencies: list):
+    """Play one IVR turn per interval and record how late each one finished"""
+    while not stop.is_set():
+        due = time.perf_counter() + TURN_INTERVAL
+        await asyncio.sleep(TURN_INTERVAL)
+        process_ivr_input("street light not working near the market")
+        latencies.append(time.perf_counter() - due)
+
+
+async def heavy_blocking(db: DatabaseService):
+    """Heavy queries called straight from the event loop"""
+    for _ in range(HEAVY_QUERIES):
+        db.get_all_complaints()
+        db.get_statistics()
+        await asyncio.sleep(0)
+
+
+async def heavy_async(adb: AsyncDatabaseService):
+    """The same queries through the async layer"""
+    for _ in range(HEAVY_QUERIES):
+        await adb.get_all_complaints()
+        await adb.get_statistics()
+
+
+async def run_scenario(load):
+    """Run the IVR probe alongside a load coroutine (or idle for one second)"""
+    stop = asyncio.Event()
+    latencies = []
+    probe = asyncio.create_task(ivr_probe(stop, latencies))
+    started = time.perf_counter()
+    if load is None:
+        await asyncio.sleep(1.0)
+    else:
+        await load
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return latencies, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    db = DatabaseService(db_path="bench.db")
+    adb = AsyncDatabaseService(db)
+    seed(db, rows)
+
+    print("=" * 60)
+    print(f"IVR latency under load ({rows:,} complaints, {HEAVY_QUERIES}x list + stats)")
+    print("=" * 60)
+
+    scenarios = [
+        ("idle", lambda: None),
+        ("blocking DatabaseService", lambda: heavy_blocking(db)),
+        ("AsyncDatabaseService", lambda: heavy_async(adb)),
+    ]
+    for name, make_load in scenarios:
+        latencies, elapsed = asyncio.run(run_scenario(make_load()))
+        print(f"{name:<26} turns={len(latencies):<5} "
+              f"p50={percentile(latencies, 50):7.2f} ms  "
+              f"p99={percentile(latencies, 99):8.2f} ms  "
+              f"max={max(latencies) * 1000:8.2f} ms  ({elapsed:.1f}s)")
+
+    adb.close()
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
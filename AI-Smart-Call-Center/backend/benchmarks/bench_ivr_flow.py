@@ -0,0 +1,134 @@
+"""
+Benchmark: IVR flow engine per-turn cost
+Times IVRController.process_input over scripted calls with the compiled
+complaint flow, then again with thousands of extra department states added
+to the definition, and compares state dispatch through the transition table
+with an if/elif chain over the same number of states.
+
+Usage: python benchmarks/bench_ivr_flow.py [calls] [extra_states]
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The service modules open their databases in the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+from services.ivr_controller import IVRController
+from services.ivr_flow import DEFAULT_FLOW_FILE, compile_flow
+
+
+# One complete call through every complaint state
+SCRIPT = [
+    "hello",
+    "street light not working",
+    "the pole is damaged",
+    "Alkapuri main road",
+    "near the bank",
+    "98765 43210",
+    "yes"
+]
+
+DISPATCH_LOOKUPS = 200000
+
+
+def with_extra_states(definition: dict, count: int) -> dict:
+    """The flow plus a chain of count department states after 'complete'"""
+    extended = copy.deepcopy(definition)
+    states = extended["states"]
+    for i in range(count):
+        states[f"dept_{i}"] = {
+            "expected_input": "department input",
+            "action": "store_input",
+            "params": {"field": f"dept_{i}"},
+            "transitions": {
+                "stored": {"next": f"dept_{i + 1}" if i + 1 < count else "complete",
+                           "prompt": "describe_complaint"}
+            }
+        }
+    if count:
+        states["complete"]["transitions"]["done"]["next"] = "dept_0"
+    return extended
+
+
+def time_turns(controller: IVRController, calls: int) -> float:
+    """Seconds per process_input call over the scripted calls"""
+    turns = 0
+    started = time.perf_counter()
+    for _ in range(calls):
+        session = controller.create_session()
+        for user_input in SCRIPT:
+            controller.process_input(user_input, session)
+            turns += 1
+        assert session["state"] == "complete"
+    return (time.perf_counter() - started) / turns
+
+
+def time_dispatch(lookup, states) -> float:
+    """Seconds per state lookup, cycling over every state"""
+    sequence = [states[i % len(states)] for i in range(DISPATCH_LOOKUPS)]
+    started = time.perf_counter()
+    for state in sequence:
+        lookup(state)
+    return (time.perf_counter() - started) / DISPATCH_LOOKUPS
+
+
+def if_chain(states):
+    """
+    A dispatcher testing states one by one, as process_input used to
+
+    Separate if/return statements behave like an elif chain; thousands of
+    elifs exceed the compiler's nesting limit.
+    """
+    lines = ["def dispatch(state):"]
+    for i, state in enumerate(states):
+        lines.append(f"    if state == {state!r}:\n        return {i}")
+    lines.append("    return None")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["dispatch"]
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    with open(DEFAULT_FLOW_FILE, encoding="utf-8") as f:
+        definition = json.load(f)
+    controller = IVRController()
+    base_flow = controller.flow
+
+    started = time.perf_counter()
+    big_flow = compile_flow(with_extra_states(definition, extra), controller._flow_actions())
+    compile_seconds = time.perf_counter() - started
+
+    print("=" * 60)
+    print(f"IVR flow engine ({calls:,} calls x {len(SCRIPT)} turns, +{extra:,} states)")
+    print("=" * 60)
+
+    time_turns(controller, 50)  # warm up caches and the ID allocator
+    base = time_turns(controller, calls)
+    controller.flow = big_flow
+    big = time_turns(controller, calls)
+    controller.flow = base_flow
+    print(f"compile (+{extra:,} states):    {compile_seconds * 1000:8.1f} ms")
+    print(f"turn, {len(base_flow.states):,} states:          {base * 1e6:8.1f} us")
+    print(f"turn, {len(big_flow.states):,} states:       {big * 1e6:8.1f} us")
+
+    for flow in (base_flow, big_flow):
+        names = list(flow.states)
+        table = time_dispatch(flow.states.get, names)
+        chain = time_dispatch(if_chain(names), names)
+        print(f"dispatch, {len(names):,} states:  table {table * 1e9:7.0f} ns   "
+              f"if/elif {chain * 1e9:9.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: complaint query plans and latency
+Seeds a scratch database, checks with EXPLAIN QUERY PLAN that every
+listed complaints query is served by an index, and times each one.
+
+Usage: python benchmarks/bench_query_plans.py [rows]
+"""
+
+import os
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The service module opens complaints.db in the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+from services.database_service import DatabaseService
+
+
+STATUSES = ["pending", "in_progress", "resolved", "closed", "rejected"]
+TYPES = ["Street Light", "Water Supply", "Road Damage", "Garbage", "Drainage", "Other"]
+ZONES = ["North", "South", "East", "West", "Central"]
+
+# (name, sql, params) for every query the API issues against complaints
+QUERIES = [
+    ("first page", "SELECT * FROM complaints ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ()),
+    ("next page", "SELECT * FROM complaints WHERE (created_at, complaint_id) < (?, ?) "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("2026-01-05T00:00:00", "BENCH-99999999")),
+    ("page by status", "SELECT * FROM complaints WHERE status = ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("pending",)),
+    ("page by type", "SELECT * FROM complaints WHERE complaint_type = ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("Water Supply",)),
+    ("page by zone", "SELECT * FROM complaints WHERE zone = ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("North",)),
+    ("page by ward", "SELECT * FROM complaints WHERE ward = ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("Ward 5",)),
+    ("date range", "SELECT * FROM complaints WHERE created_at >= ? AND created_at < ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("2026-01-01", "2026-01-08")),
+    ("recently updated", "SELECT * FROM complaints ORDER BY updated_at DESC LIMIT 50", ()),
+    ("by phone", "SELECT * FROM complaints WHERE phone_key = ? "
+     "ORDER BY created_at DESC, complaint_id DESC LIMIT 50", ("+919876500000",)),
+    ("count by status", "SELECT status, COUNT(*) FROM complaints GROUP BY status", ()),
+    ("count by type", "SELECT complaint_type, COUNT(*) FROM complaints GROUP BY complaint_type", ()),
+    ("count by zone", "SELECT zone, COUNT(*) FROM complaints GROUP BY zone", ()),
+]
+
+
+def seed(db: DatabaseService, rows: int):
+    """Insert synthetic complaints in one transaction"""
+    start = datetime(2026, 1, 1)
+    data = []
+    for i in range(rows):
+        created = (start + timedelta(seconds=i * 7)).isoformat()
+        data.append((
+            f"BENCH-{i:08d}", random.choice(TYPES), "", "Area", f"Ward {random.randint(1, 19)}",
+            random.choice(ZONES), "", f"98765{i % 100000:05d}", random.choice(STATUSES),
+            "normal", created, created, None, None
+        ))
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO complaints (complaint_id, complaint_type, house_no, area, ward, zone, "
+            "description, phone_number, status, priority, created_at, updated_at, assigned_to, "
+            "resolution_notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", data
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+
+
+def uses_index(plan_rows) -> bool:
+    """True if no step of the plan is a bare scan of the complaints table"""
+    details = [row[3] for row in plan_rows]
+    for detail in details:
+        if "complaints" in detail and detail.startswith("SCAN") and "INDEX" not in detail:
+            return False
+    return any("INDEX" in detail for detail in details)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    db = DatabaseService(db_path="bench.db")
+
+    print("=" * 60)
+    print(f"Query plan benchmark ({rows:,} complaints, schema v{db.get_schema_version()})")
+    print("=" * 60)
+
+    seed(db, rows)
+
+    failures = 0
+    with db._get_connection() as conn:
+        for name, sql, params in QUERIES:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            ok = uses_index(plan)
+            failures += not ok
+
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            mark = "✓" if ok else "✗"
+            print(f"{mark} {name:<18} {elapsed_ms:8.2f} ms  {' | '.join(r[3] for r in plan)}")
+
+    db.close()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} queries do not use an index")
+        sys.exit(1)
+    print("✅ All queries use an index")
+
+
+if __name__ == "__main__":
+    main()
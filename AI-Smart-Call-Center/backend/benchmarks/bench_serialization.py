@@ -0,0 +1,123 @@
+"""
+Benchmark: complaint list serialization
+Encodes one large list page the old way (per-complaint dicts with hasattr
+checks, then jsonable_encoder and JSONResponse) and the new way (compiled
+serializer plus FastJSONResponse), and reports time per page and per row.
+
+Usage: python benchmarks/bench_serialization.py [rows]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import Complaint, ComplaintStatus
+from utils import json_response
+from utils.json_response import FastJSONResponse, compile_serializer
+
+
+REPEATS = 10
+TYPES = ["Street Light", "Water Supply", "Road Damage", "Garbage", "Drainage", "Other"]
+ZONES = ["North", "South", "East", "West", "Central"]
+
+serialize_list_item = compile_serializer((
+    'complaint_id', 'complaint_type', 'area', 'ward', 'zone', 'status',
+    'created_at', 'phone_number'
+))
+
+
+def make_complaints(count: int):
+    """Synthetic complaints as the list endpoint receives them"""
+    start = datetime(2026, 1, 1)
+    complaints = []
+    for i in range(count):
+        created = start + timedelta(seconds=i * 7, microseconds=i)
+        complaints.append(Complaint(
+            complaint_id=f"COMP-{created.strftime('%Y%m%d%H%M%S')}-{i:08X}",
+            complaint_type=random.choice(TYPES),
+            area="Alkapuri",
+            ward=f"Ward {random.randint(1, 19)}",
+            zone=random.choice(ZONES),
+            phone_number=f"98{random.randint(10000000, 99999999)}",
+            status=random.choice(list(ComplaintStatus)),
+            created_at=created,
+            updated_at=created
+        ))
+    return complaints
+
+
+def encode_before(complaints) -> bytes:
+    """Previous list route body: dict per row, then FastAPI's default path"""
+    content = {
+        "success": True,
+        "count": len(complaints),
+        "data": [
+            {
+                "complaint_id": c.complaint_id,
+                "complaint_type": c.complaint_type,
+                "area": c.area,
+                "ward": c.ward,
+                "zone": c.zone,
+                "status": c.status.value if hasattr(c.status, 'value') else c.status,
+                "created_at": c.created_at.isoformat() if hasattr(c.created_at, 'isoformat') else str(c.created_at),
+                "phone_number": c.phone_number
+            }
+            for c in complaints
+        ]
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def encode_after(complaints) -> bytes:
+    """Current list route body"""
+    return FastJSONResponse({
+        "success": True,
+        "count": len(complaints),
+        "data": [serialize_list_item(c) for c in complaints]
+    }).body
+
+
+def best_of(encode, complaints) -> float:
+    """Fastest of REPEATS runs, in seconds"""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        encode(complaints)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    complaints = make_complaints(rows)
+
+    # Both paths must produce the same document
+    assert json.loads(encode_before(complaints)) == json.loads(encode_after(complaints))
+
+    print("=" * 60)
+    print(f"List serialization ({rows:,} complaints, best of {REPEATS})")
+    print("=" * 60)
+
+    baseline = best_of(encode_before, complaints)
+    scenarios = [("before: dicts + jsonable_encoder", baseline)]
+    if json_response.orjson is not None:
+        scenarios.append(("after: compiled + orjson", best_of(encode_after, complaints)))
+    orjson_module, json_response.orjson = json_response.orjson, None
+    scenarios.append(("after: compiled + stdlib json", best_of(encode_after, complaints)))
+    json_response.orjson = orjson_module
+
+    for name, seconds in scenarios:
+        print(f"{name:<34} {seconds * 1000:8.1f} ms  "
+              f"{seconds / rows * 1e6:6.2f} us/row  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
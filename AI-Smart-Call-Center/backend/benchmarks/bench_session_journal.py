@@ -0,0 +1,102 @@
+"""
+Benchmark: IVR session journal
+Measures what journaling adds to each IVR turn's session write, then fills
+a journal with many live sessions (several turns each) and times recovery
+from it, before and after compaction.
+
+Usage: python benchmarks/bench_session_journal.py [live_sessions] [turns_per_session]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The service modules open their databases in the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+from services.conversation_history import record_turn, ROLE_USER, ROLE_ASSISTANT
+from services.ivr_controller import IVRController
+from services.session_journal import SessionJournal
+from services.session_store import InMemorySessionStore
+
+
+OVERHEAD_WRITES = 20000
+
+
+def make_session(controller: IVRController, turns: int) -> dict:
+    """A session as it looks a few turns into a call"""
+    session = controller.create_session()
+    session["state"] = "ask_location"
+    session["collected_data"].update(category="Street Light", sub_category="light_off")
+    for _ in range(turns):
+        record_turn(session, ROLE_USER, "street light near the temple is not working",
+                    store=controller.history_store)
+        record_turn(session, ROLE_ASSISTANT, "Please tell me the area or address.",
+                    store=controller.history_store)
+    return session
+
+
+def time_writes(store: InMemorySessionStore, sessions) -> float:
+    """Seconds per put, cycling over the sessions"""
+    started = time.perf_counter()
+    for i in range(OVERHEAD_WRITES):
+        session = sessions[i % len(sessions)]
+        store.put(session["session_id"], session)
+    return (time.perf_counter() - started) / OVERHEAD_WRITES
+
+
+def main():
+    live = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    controller = IVRController()
+
+    print("=" * 60)
+    print(f"Session journal ({live:,} live sessions, {turns} turns each)")
+    print("=" * 60)
+
+    # Per-turn overhead: one put per turn, with and without the journal
+    sample = [make_session(controller, turns) for _ in range(1000)]
+    plain = time_writes(InMemorySessionStore(max_sessions=live), [dict(s) for s in sample])
+    journal = SessionJournal("overhead.journal")
+    journaled = time_writes(InMemorySessionStore(max_sessions=live, journal=journal), sample)
+    journal.close()
+    metrics = journal.get_metrics()
+    print(f"put without journal:    {plain * 1e6:8.1f} us")
+    print(f"put with journal:       {journaled * 1e6:8.1f} us  "
+          f"(+{(journaled - plain) * 1e6:.1f} us/turn, "
+          f"{metrics['records_in_file'] / max(metrics['fsyncs'], 1):,.0f} turns per fsync)")
+
+    # Recovery: every session written once per turn, as a real call would
+    journal = SessionJournal("live.journal")
+    store = InMemorySessionStore(max_sessions=live, journal=journal)
+    sessions = [make_session(controller, turns) for _ in range(live)]
+    for turn in range(turns):
+        for session in sessions:
+            store.put(session["session_id"], session)
+    journal.close()
+    size_mb = os.path.getsize("live.journal") / 1e6
+
+    recovered = InMemorySessionStore(max_sessions=live, journal=SessionJournal("live.journal"))
+    stats = recovered.recover()
+    assert stats["recovered"] == live and len(recovered) == live
+    print(f"recover (full journal): {stats['seconds']:8.2f} s  "
+          f"{stats['records']:,} records, {size_mb:.1f} MB")
+
+    started = time.perf_counter()
+    records = recovered.journal.compact(recovered._snapshot)
+    compact_seconds = time.perf_counter() - started
+    recovered.close()
+    size_mb = os.path.getsize("live.journal") / 1e6
+
+    stats = InMemorySessionStore(max_sessions=live, journal=SessionJournal("live.journal")).recover()
+    assert stats["recovered"] == live
+    print(f"compact:                {compact_seconds:8.2f} s  {records:,} records, {size_mb:.1f} MB")
+    print(f"recover (compacted):    {stats['seconds']:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: complaint hot set warm start
+Seeds a scratch database with open and closed complaints, then warms the
+repository hot set with ComplaintRepository.warm_start() at several open
+tier budgets. Reports rows loaded, load time and rows per second for each; the
+load is bounded by the budget, not by the number of open complaints.
+
+Usage: python benchmarks/bench_warm_start.py [open_rows]
+"""
+
+import asyncio
+import os
+import sys
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The service module opens complaints.db in the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+from services.async_database_service import AsyncDatabaseService
+from services.complaint_repository import ComplaintRepository
+from services.database_service import DatabaseService
+from utils.phone import normalize_phone
+
+
+TYPES = ["Street Light", "Water Supply", "Road Damage", "Garbage", "Drainage", "Other"]
+ZONES = ["North", "South", "East", "West", "Central"]
+# One closed complaint per this many open ones, so the status filter matters
+CLOSED_PER_OPEN = 4
+OPEN_BUDGETS = (1000, 10000, 50000)
+
+
+def seed(db: DatabaseService, open_rows: int):
+    """Insert synthetic complaints in one transaction"""
+    start = datetime(2026, 1, 1)
+    total = open_rows + open_rows // CLOSED_PER_OPEN
+    data = []
+    for i in range(total):
+        created = (start + timedelta(seconds=i * 7)).isoformat()
+        status = random.choice(["pending", "in_progress"]) if i < open_rows else "resolved"
+        phone = f"98765{i % 200000:05d}"
+        data.append((
+            f"BENCH-{i:08d}", random.choice(TYPES), "", "Area", f"Ward {random.randint(1, 19)}",
+            random.choice(ZONES), "Streetlight not working near the temple", phone,
+            normalize_phone(phone), status, "normal", created, created, None, None
+        ))
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO complaints (complaint_id, complaint_type, house_no, area, ward, zone, "
+            "description, phone_number, phone_key, status, priority, created_at, updated_at, "
+            "assigned_to, resolution_notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            data
+        )
+        conn.commit()
+
+
+def main():
+    open_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    db = DatabaseService(db_path="bench.db")
+    seed(db, open_rows)
+
+    print("=" * 60)
+    print(f"Warm start benchmark ({open_rows:,} open complaints)")
+    print("=" * 60)
+
+    adb = AsyncDatabaseService(db)
+    for budget in OPEN_BUDGETS:
+        repository = ComplaintRepository(adb, open_size=budget)
+        result = asyncio.run(repository.warm_start())
+        assert result["rows"] == min(budget, open_rows) == len(repository.open_cache)
+        print(f"open tier {budget:>7,}  {result['rows']:>7,} rows  {result['seconds']:8.3f} s  "
+              f"{result['rows_per_second']:10,} rows/s")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,17 +9,23 @@ import os
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any
 import uvicorn
 
 from routes.complaint import router as complaint_router
+from routes.reports import router as reports_router
 from services.ai_service import AIService
 from services.tts_service import TTSService
+from services.database_service import get_db_service
+from services.complaint_repository import get_complaint_repository
 from services.ivr_controller import get_ivr_controller, process_ivr_input
+from services.session_store import get_session_store, SessionConflictError, SessionLocks
+from services.conversation_history import transcript, compress_entries, decompress_entries, page
 
 # Create FastAPI app
 app = FastAPI(
@@ -43,6 +49,7 @@ tts_service = TTSService()
 
 # Include routers
 app.include_router(complaint_router, prefix="/api/complaints", tags=["Complaints"])
+app.include_router(reports_router, prefix="/api/reports", tags=["Reports"])
 
 
 # ===== Request/Response Models =====
@@ -66,6 +73,19 @@ async def health_check():
     }
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Runtime metrics for the storage layer"""
+    return {
+        "success": True,
+        "database": get_db_service().get_pool_metrics(),
+        "writer": get_db_service().get_writer_metrics(),
+        "complaint_hot_set": get_complaint_repository().get_cache_metrics(),
+        "ivr_sessions": get_session_store().get_metrics(),
+        "ivr_session_locks": ivr_session_locks.get_metrics()
+    }
+
+
 @app.get("/api/info")
 async def app_info():
     """Application information endpoint"""
@@ -151,14 +171,69 @@ async def generate_response(request: Request):
 
 # ===== IVR Controller Endpoints =====
 
-# Store active IVR sessions in memory (for demo - in production use Redis/DB)
-ivr_sessions: Dict[str, Dict] = {}
+# Active IVR sessions, shared by all workers with the SQLite backend: idle ones
+# expire after a TTL and the least recently used are evicted at the size cap,
+# so abandoned calls do not pile up
+ivr_sessions = get_session_store()
+# Turns on one session run one at a time, in arrival order
+ivr_session_locks = SessionLocks()
+
+
+def spill_ivr_transcript(session: Dict):
+    """Keep the full transcript of a session leaving the store, compressed"""
+    entries = transcript(session, get_db_service())
+    if entries:
+        get_db_service().save_transcript(
+            session["session_id"],
+            session["collected_data"].get("complaint_id"),
+            session.get("created_at"),
+            len(entries),
+            compress_entries(entries)
+        )
+
+
+ivr_sessions.on_remove = spill_ivr_transcript
+
+
+@app.on_event("startup")
+async def start_ivr_session_sweeper():
+    """Restore in-flight IVR calls, then expire idle sessions in the background"""
+    budget = float(os.getenv("IVR_SESSION_RECOVERY_SECONDS", "5"))
+    recovery = await run_in_threadpool(ivr_sessions.recover, budget)
+    if recovery:
+        print(f"✓ IVR sessions recovered: {recovery['recovered']} live from "
+              f"{recovery['records']} journal records in {recovery['seconds']}s"
+              + ("" if recovery['complete'] else " (time budget reached)"))
+    ivr_sessions.start_sweeper()
+
+
+@app.on_event("shutdown")
+async def stop_ivr_session_sweeper():
+    """Stop the IVR session sweeper and flush the session journal"""
+    await ivr_sessions.stop_sweeper()
+    ivr_sessions.close()
+
 
 class IVRRequest(BaseModel):
     user_input: str
     session_id: Optional[str] = None
 
 
+def apply_ivr_turn(session_id: Optional[str], user_input: str) -> Dict:
+    """Load (or create) a session, process one input and store the result"""
+    session = ivr_sessions.get(session_id) if session_id else None
+    if session is None:
+        controller = get_ivr_controller()
+        session = controller.create_session()
+        session_id = session["session_id"]
+    
+    result = process_ivr_input(user_input, session)
+    
+    # Fails if another worker changed the session meanwhile
+    ivr_sessions.put(session_id, session)
+    return result
+
+
 @app.post("/api/ivr/session")
 async def create_ivr_session():
     """Create a new IVR session"""
@@ -166,7 +241,7 @@ async def create_ivr_session():
         controller = get_ivr_controller()
         session = controller.create_session()
         session_id = session["session_id"]
-        ivr_sessions[session_id] = session
+        await run_in_threadpool(ivr_sessions.put, session_id, session)
         
         return {
             "success": True,
@@ -193,49 +268,64 @@ async def process_ivr_request(request: IVRRequest):
     """
     try:
         session_id = request.session_id
+        if not session_id:
+            return await run_in_threadpool(apply_ivr_turn, None, request.user_input)
         
-        # Get or create session
-        if session_id and session_id in ivr_sessions:
-            session = ivr_sessions[session_id]
-        else:
-            controller = get_ivr_controller()
-            session = controller.create_session()
-            session_id = session["session_id"]
-            ivr_sessions[session_id] = session
-        
-        # Process the input
-        result = process_ivr_input(request.user_input, session)
-        
-        # Update session in storage
-        ivr_sessions[session_id] = session
-        
-        return result
+        # Storage and processing block, so they run off the event loop;
+        # the lock keeps this session's other turns waiting meanwhile
+        async with ivr_session_locks.hold(session_id):
+            return await run_in_threadpool(apply_ivr_turn, session_id, request.user_input)
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ivr/session/{session_id}")
-async def get_ivr_session(session_id: str):
-    """Get current IVR session state"""
-    if session_id not in ivr_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+async def get_ivr_session(
+    session_id: str,
+    history_offset: int = Query(0, ge=0, description="First history entry to return"),
+    history_limit: int = Query(50, ge=1, le=200, description="History page size")
+):
+    """Get current IVR session state with one page of its conversation history"""
+    session = await run_in_threadpool(ivr_sessions.get, session_id)
+    if session is not None:
+        # Older turns are read back from their stored chunks
+        entries = await run_in_threadpool(transcript, session, get_db_service())
+        response = {
+            "success": True,
+            "session_id": session_id,
+            "state": session.get("state"),
+            "language": session.get("language"),
+            "collected_data": session.get("collected_data")
+        }
+    else:
+        # Ended sessions are answered from their stored transcript
+        ended = await run_in_threadpool(get_db_service().get_transcript, session_id)
+        if ended is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        entries = decompress_entries(ended["data"])
+        response = {
+            "success": True,
+            "session_id": session_id,
+            "state": "ended",
+            "complaint_id": ended["complaint_id"],
+            "ended_at": ended["ended_at"]
+        }
     
-    session = ivr_sessions[session_id]
-    return {
-        "success": True,
-        "session_id": session_id,
-        "state": session.get("state"),
-        "language": session.get("language"),
-        "collected_data": session.get("collected_data"),
-        "conversation_history": session.get("conversation_history", [])
-    }
+    response.update({
+        "conversation_history": page(entries, history_offset, history_limit),
+        "history_total": len(entries),
+        "history_offset": history_offset,
+        "has_more_history": history_offset + history_limit < len(entries)
+    })
+    return response
 
 
 @app.delete("/api/ivr/session/{session_id}")
 async def end_ivr_session(session_id: str):
     """End and cleanup IVR session"""
-    if session_id in ivr_sessions:
-        del ivr_sessions[session_id]
+    await run_in_threadpool(ivr_sessions.delete, session_id)
     
     return {
         "success": True,
@@ -381,7 +471,8 @@ async def generate_complaint_id(request: Request):
         complaint_type = data.get("complaint_type", "Other")
         ward = data.get("ward", "")
         
-        complaint_id = vmc_service.generate_complaint_id(complaint_type, ward)
+        # Allocation may reserve an ID block in SQLite; keep it off the event loop
+        complaint_id = await run_in_threadpool(vmc_service.generate_complaint_id, complaint_type, ward)
         
         return {"success": True, "complaint_id": complaint_id}
     except Exception as e:
@@ -62,12 +62,15 @@ class Priority(str, Enum):
 class ComplaintRequest(BaseModel):
     """Request model for creating a complaint"""
     complaint_type: str = Field(..., description="Type of complaint (Street Light, Water Supply, etc.)")
+    sub_category: str = Field(default="", description="Sub-category id within the complaint type")
     house_no: str = Field(default="", description="House or building number")
     area: str = Field(default="", description="Area or locality")
     ward: str = Field(default="", description="Ward number")
     zone: str = Field(default="", description="Zone (North, South, East, West, Central)")
     description: str = Field(default="", description="Detailed complaint description")
     phone_number: str = Field(default="", description="Contact phone number")
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90, description="Latitude of the issue (WGS84)")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180, description="Longitude of the issue (WGS84)")
     
     class Config:
         json_schema_extra = {
@@ -87,12 +90,15 @@ class Complaint(BaseModel):
     """Complete complaint model"""
     complaint_id: str = Field(..., description="Unique complaint ID")
     complaint_type: str
+    sub_category: str = ""
     house_no: str = ""
     area: str = ""
     ward: str = ""
     zone: str = ""
     description: str = ""
     phone_number: str = ""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     status: ComplaintStatus = ComplaintStatus.PENDING
     priority: str = "normal"
     created_at: datetime = Field(default_factory=datetime.now)
@@ -103,7 +109,7 @@ class Complaint(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "complaint_id": "COMP-20260121-ABC12345",
+                "complaint_id": "VMC-SL-W01-20260121-001",
                 "complaint_type": "Street Light",
                 "house_no": "123",
                 "area": "Main Road",
@@ -4,29 +4,66 @@ API endpoints for complaint management using FastAPI
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel
-from services.complaint_service import get_complaint_service
-from services.database_service import get_db_service
+from pydantic import BaseModel, Field
+from services.complaint_repository import get_complaint_repository
+from services.database_service import decode_cursor, MAX_PAGE_SIZE, EXPORT_COLUMNS, MAX_NEARBY_RADIUS_M, to_local_naive
+from services.export_service import stream_csv, stream_ndjson, gzip_stream
+from services.async_database_service import get_async_db_service
 from models import ComplaintRequest, ComplaintStatus
+from utils.phone import normalize_phone
+from utils.json_response import FastJSONResponse, compile_serializer
 
 # Create router
 router = APIRouter()
 
+# Largest batch accepted by POST /bulk
+MAX_BULK_COMPLAINTS = 5000
+
+# Serializers per response shape; routes return FastJSONResponse directly so
+# each payload is encoded once, without jsonable_encoder
+serialize_list_item = compile_serializer((
+    'complaint_id', 'complaint_type', 'area', 'ward', 'zone', 'status',
+    'created_at', 'phone_number'
+))
+serialize_detail = compile_serializer((
+    'complaint_id', 'complaint_type', 'sub_category', 'house_no', 'area', 'ward',
+    'zone', 'description', 'phone_number', 'status', 'priority', 'created_at',
+    'updated_at', 'assigned_to', 'resolution_notes', 'latitude', 'longitude'
+))
+serialize_phone_item = compile_serializer((
+    'complaint_id', 'complaint_type', 'sub_category', 'area', 'ward', 'status', 'created_at'
+))
+serialize_nearby_item = compile_serializer((
+    'complaint_id', 'complaint_type', 'area', 'ward', 'status', 'latitude', 'longitude'
+))
+serialize_search_item = compile_serializer((
+    'complaint_id', 'complaint_type', 'area', 'status'
+))
+
 # Get service instances
-complaint_service = get_complaint_service()
-db_service = get_db_service()
+complaint_repository = get_complaint_repository()
+db_service = get_async_db_service()
 
 
 # ===== Request/Response Models =====
 class ComplaintCreateRequest(BaseModel):
     complaint_type: str
+    sub_category: str = ""
     house_no: str = ""
     area: str = ""
     ward: str = ""
     zone: str = ""
     description: str = ""
     phone_number: str = ""
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+
+class BulkComplaintCreateRequest(BaseModel):
+    complaints: List[ComplaintCreateRequest] = Field(..., min_length=1, max_length=MAX_BULK_COMPLAINTS)
 
 
 class StatusUpdateRequest(BaseModel):
@@ -42,19 +79,19 @@ async def create_complaint(request: ComplaintCreateRequest):
         # Create complaint request object
         complaint_request = ComplaintRequest(
             complaint_type=request.complaint_type,
+            sub_category=request.sub_category,
             house_no=request.house_no,
             area=request.area,
             ward=request.ward,
             zone=request.zone,
             description=request.description,
-            phone_number=request.phone_number
+            phone_number=request.phone_number,
+            latitude=request.latitude,
+            longitude=request.longitude
         )
         
-        # Create complaint
-        complaint = complaint_service.create_complaint(complaint_request)
-        
-        # Save to database
-        db_service.save_complaint(complaint)
+        # Create and persist complaint
+        complaint = await complaint_repository.create(complaint_request)
         
         return {
             "success": True,
@@ -71,68 +108,191 @@ async def create_complaint(request: ComplaintCreateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("")
-async def get_all_complaints():
-    """Get all complaints"""
+@router.post("/bulk")
+async def create_complaints_bulk(request: BulkComplaintCreateRequest):
+    """Create many complaints in one request (e.g. during a citywide outage)"""
     try:
-        # Try database first, fallback to in-memory
-        complaints = db_service.get_all_complaints()
-        if not complaints:
-            complaints = complaint_service.get_all_complaints()
+        # Saved to database in a single transaction
+        complaints = await complaint_repository.create_many([
+            ComplaintRequest(**item.model_dump()) for item in request.complaints
+        ])
         
         return {
             "success": True,
+            "message": f"{len(complaints)} complaints created successfully",
             "count": len(complaints),
-            "data": [
-                {
-                    "complaint_id": c.complaint_id,
-                    "complaint_type": c.complaint_type,
-                    "area": c.area,
-                    "ward": c.ward,
-                    "zone": c.zone,
-                    "status": c.status.value if hasattr(c.status, 'value') else c.status,
-                    "created_at": c.created_at.isoformat() if hasattr(c.created_at, 'isoformat') else str(c.created_at),
-                    "phone_number": c.phone_number
-                }
-                for c in complaints
-            ]
+            "complaint_ids": [c.complaint_id for c in complaints]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("")
+async def get_all_complaints(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    complaint_type: Optional[str] = Query(None, description="Filter by complaint type"),
+    ward: Optional[str] = Query(None, description="Filter by ward"),
+    zone: Optional[str] = Query(None, description="Filter by zone"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="Created before (ISO 8601)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+):
+    """Get a page of complaints, newest first"""
+    try:
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        filters = {
+            "status": status,
+            "complaint_type": complaint_type,
+            "ward": ward,
+            "zone": zone
+        }
+        complaints, next_cursor = await db_service.list_complaints(
+            filters, created_from, created_to, cursor, limit
+        )
+        
+        return FastJSONResponse({
+            "success": True,
+            "count": len(complaints),
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "data": [serialize_list_item(c) for c in complaints]
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+def export_complaints(
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Compress the download with gzip"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    complaint_type: Optional[str] = Query(None, description="Filter by complaint type"),
+    ward: Optional[str] = Query(None, description="Filter by ward"),
+    zone: Optional[str] = Query(None, description="Filter by zone"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="Created before (ISO 8601)")
+):
+    """Stream every matching complaint as CSV or NDJSON in constant memory"""
+    encoders = {
+        "csv": (stream_csv, "text/csv"),
+        "ndjson": (stream_ndjson, "application/x-ndjson")
+    }
+    if format not in encoders:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+    
+    encoder, media_type = encoders[format]
+    
+    # Same local-time bounds build_complaint_filters uses; checked here because
+    # the rows are only read once the response starts streaming
+    created_from, created_to = to_local_naive(created_from), to_local_naive(created_to)
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+    
+    filters = {
+        "status": status,
+        "complaint_type": complaint_type,
+        "ward": ward,
+        "zone": zone
+    }
+    
+    # Sync generator: StreamingResponse pulls it on a worker thread, off the event loop
+    rows = db_service.db.iter_complaint_rows(filters, created_from, created_to)
+    body = encoder(EXPORT_COLUMNS, rows)
+    filename = f"complaints-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/by-phone/{phone}")
+async def get_complaints_by_phone(
+    phone: str,
+    open_only: bool = Query(False, description="Only pending and in-progress complaints"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Maximum results")
+):
+    """Get a caller's complaints, newest first"""
+    try:
+        phone_key = normalize_phone(phone)
+        if not phone_key:
+            raise HTTPException(status_code=400, detail=f"Invalid phone number: {phone}")
+        
+        complaints = await db_service.get_complaints_by_phone(phone_key, open_only, limit)
+        
+        return FastJSONResponse({
+            "success": True,
+            "phone": phone_key,
+            "count": len(complaints),
+            "data": [serialize_phone_item(c) for c in complaints]
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/nearby")
+async def get_nearby_complaints(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the centre point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the centre point"),
+    radius: float = Query(1000, gt=0, le=MAX_NEARBY_RADIUS_M, description="Radius in metres"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum results")
+):
+    """Get located complaints within a radius, nearest first (admin map, field crews)"""
+    try:
+        nearby = await db_service.get_nearby_complaints(lat, lon, radius, status, limit)
+        
+        data = []
+        for c, distance in nearby:
+            item = serialize_nearby_item(c)
+            item["distance_m"] = round(distance, 1)
+            data.append(item)
+        
+        return FastJSONResponse({
+            "success": True,
+            "count": len(nearby),
+            "center": {"lat": lat, "lon": lon},
+            "radius": radius,
+            "data": data
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{complaint_id}")
 async def get_complaint(complaint_id: str):
     """Get a specific complaint by ID"""
     try:
-        # Try database first
-        complaint = db_service.get_complaint(complaint_id)
-        if not complaint:
-            complaint = complaint_service.get_complaint(complaint_id)
+        complaint = await complaint_repository.get(complaint_id)
         
         if not complaint:
             raise HTTPException(status_code=404, detail="Complaint not found")
         
-        return {
+        return FastJSONResponse({
             "success": True,
-            "data": {
-                "complaint_id": complaint.complaint_id,
-                "complaint_type": complaint.complaint_type,
-                "house_no": complaint.house_no,
-                "area": complaint.area,
-                "ward": complaint.ward,
-                "zone": complaint.zone,
-                "description": complaint.description,
-                "phone_number": complaint.phone_number,
-                "status": complaint.status.value if hasattr(complaint.status, 'value') else complaint.status,
-                "priority": complaint.priority,
-                "created_at": complaint.created_at.isoformat() if hasattr(complaint.created_at, 'isoformat') else str(complaint.created_at),
-                "updated_at": complaint.updated_at.isoformat() if hasattr(complaint.updated_at, 'isoformat') else str(complaint.updated_at),
-                "assigned_to": complaint.assigned_to,
-                "resolution_notes": complaint.resolution_notes
-            }
-        }
+            "data": serialize_detail(complaint)
+        })
         
     except HTTPException:
         raise
@@ -150,7 +310,7 @@ async def update_complaint(complaint_id: str, request: StatusUpdateRequest):
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid status: {request.status}")
         
-        complaint = complaint_service.update_complaint_status(
+        complaint = await complaint_repository.update_status(
             complaint_id, 
             status, 
             request.notes
@@ -159,9 +319,6 @@ async def update_complaint(complaint_id: str, request: StatusUpdateRequest):
         if not complaint:
             raise HTTPException(status_code=404, detail="Complaint not found")
         
-        # Update in database
-        db_service.update_complaint_status(complaint_id, status.value, request.notes)
-        
         return {
             "success": True,
             "message": "Complaint updated successfully",
@@ -182,14 +339,11 @@ async def update_complaint(complaint_id: str, request: StatusUpdateRequest):
 async def delete_complaint(complaint_id: str):
     """Delete a complaint"""
     try:
-        success = complaint_service.delete_complaint(complaint_id)
+        success = await complaint_repository.delete(complaint_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Complaint not found")
         
-        # Delete from database
-        db_service.delete_complaint(complaint_id)
-        
         return {
             "success": True,
             "message": "Complaint deleted successfully"
@@ -202,34 +356,40 @@ async def delete_complaint(complaint_id: str):
 
 
 @router.get("/search/query")
-async def search_complaints(q: str = Query(..., description="Search query")):
-    """Search complaints"""
+async def search_complaints(
+    q: str = Query(..., description="Search query"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of results to skip")
+):
+    """Search complaints, best matches first"""
     try:
-        complaints = complaint_service.search_complaints(q)
+        complaints, has_more = await db_service.search_complaints(q, limit, offset)
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "count": len(complaints),
-            "data": [
-                {
-                    "complaint_id": c.complaint_id,
-                    "complaint_type": c.complaint_type,
-                    "area": c.area,
-                    "status": c.status.value if hasattr(c.status, 'value') else c.status
-                }
-                for c in complaints
-            ]
-        }
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more,
+            "data": [serialize_search_item(c) for c in complaints]
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/stats/summary")
-async def get_statistics():
-    """Get complaint statistics"""
+async def get_statistics(
+    since_version: Optional[int] = Query(
+        None, description="Only counters changed after this version (from a previous response)"
+    )
+):
+    """Get complaint statistics, or only what changed since a version"""
     try:
-        stats = complaint_service.get_statistics()
+        if since_version is None:
+            stats = await db_service.get_statistics()
+        else:
+            stats = await db_service.get_statistics_delta(since_version)
         
         return {
             "success": True,
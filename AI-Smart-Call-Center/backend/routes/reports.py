@@ -0,0 +1,66 @@
+"""
+AI Smart Call Center - Report Routes
+Pre-aggregated complaint time series for the reports and dashboard pages
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timedelta
+from typing import Optional
+from services.async_database_service import get_async_db_service
+from services.database_service import to_local_naive
+from services.migrations import ROLLUP_DIMENSIONS
+
+# Create router
+router = APIRouter()
+
+# Get service instances
+db_service = get_async_db_service()
+
+# Default and maximum range per granularity
+DEFAULT_RANGE = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+
+
+# ===== API Endpoints =====
+@router.get("/timeseries")
+async def get_timeseries(
+    granularity: str = Query("day", description="Bucket size: hour or day"),
+    dimension: str = Query("all", description="all, " + ", ".join(ROLLUP_DIMENSIONS)),
+    value: Optional[str] = Query(None, description="Only this value of the dimension"),
+    start: Optional[datetime] = Query(None, description="Range start (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Range end (ISO 8601), defaults to now")
+):
+    """Get complaint counts per hour or day, optionally broken down by a dimension"""
+    try:
+        if granularity not in DEFAULT_RANGE:
+            raise HTTPException(status_code=400, detail=f"Invalid granularity: {granularity}")
+        if dimension != "all" and dimension not in ROLLUP_DIMENSIONS:
+            raise HTTPException(status_code=400, detail=f"Invalid dimension: {dimension}")
+        
+        # Aware and naive bounds cannot be compared; both are made local naive
+        start, end = to_local_naive(start), to_local_naive(end)
+        end = end or datetime.now()
+        start = start or end - DEFAULT_RANGE[granularity]
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must be before end")
+        if end - start > MAX_RANGE[granularity]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Range too large for {granularity} buckets (max {MAX_RANGE[granularity].days} days)"
+            )
+        
+        series = await db_service.get_timeseries(granularity, dimension, start, end, value)
+        
+        return {
+            "success": True,
+            "granularity": granularity,
+            "dimension": dimension,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": series
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,151 @@
+"""
+AI Smart Call Center - Async Database Service
+Awaitable wrapper that keeps SQLite work off the event loop
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models import Complaint
+from services.database_service import DatabaseService, get_db_service
+
+
+class AsyncDatabaseService:
+    """
+    Async mirror of DatabaseService
+
+    Every method has the same name and arguments as its DatabaseService
+    counterpart but runs on a dedicated thread pool, so a slow list or
+    stats query never stalls uvicorn's event loop (and live IVR turns).
+    The pool is kept separate from the default executor so database work
+    cannot starve other run_in_executor users. It has one thread per pooled
+    connection by default: extra threads would only block in the pool's
+    checkout, and calls queue on the executor instead.
+    """
+
+    def __init__(self, db_service: DatabaseService, max_workers: Optional[int] = None):
+        self.db = db_service
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db_service.pool.pool_size,
+            thread_name_prefix="db-worker"
+        )
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking DatabaseService call on the database executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def run_in_db_executor(self, func, *args, **kwargs):
+        """
+        Run other blocking database work (e.g. ID allocation) on the same
+        executor as the DatabaseService mirrors
+        """
+        return await self._run(func, *args, **kwargs)
+
+    async def save_complaint(self, complaint: Complaint) -> bool:
+        return await self._run(self.db.save_complaint, complaint)
+
+    async def save_complaints(self, complaints: List[Complaint], chunk_size: int = 1000) -> int:
+        return await self._run(self.db.save_complaints, complaints, chunk_size)
+
+    async def get_complaint(self, complaint_id: str) -> Optional[Complaint]:
+        return await self._run(self.db.get_complaint, complaint_id)
+
+    async def get_complaint_updated_at(self, complaint_id: str) -> Optional[datetime]:
+        return await self._run(self.db.get_complaint_updated_at, complaint_id)
+
+    async def get_all_complaints(self) -> List[Complaint]:
+        return await self._run(self.db.get_all_complaints)
+
+    async def get_complaints_by_phone(
+        self, phone: str, open_only: bool = False, limit: int = 50
+    ) -> List[Complaint]:
+        return await self._run(self.db.get_complaints_by_phone, phone, open_only, limit)
+
+    async def get_nearby_complaints(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float = 1000,
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Tuple[Complaint, float]]:
+        return await self._run(self.db.get_nearby_complaints, lat, lon, radius_m, status, limit)
+
+    async def get_open_complaints(self, limit: int) -> List[Complaint]:
+        return await self._run(self.db.get_open_complaints, limit)
+
+    async def list_complaints(
+        self,
+        filters: Optional[Dict] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Complaint], Optional[str]]:
+        return await self._run(
+            self.db.list_complaints, filters, created_from, created_to, cursor, limit
+        )
+
+    async def search_complaints(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[Complaint], bool]:
+        return await self._run(self.db.search_complaints, query, limit, offset)
+
+    async def get_timeseries(
+        self,
+        granularity: str,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        value: Optional[str] = None
+    ) -> Dict[str, List[dict]]:
+        return await self._run(self.db.get_timeseries, granularity, dimension, start, end, value)
+
+    async def update_complaint_status(self, complaint_id: str, status: str, notes: str = None) -> bool:
+        return await self._run(self.db.update_complaint_status, complaint_id, status, notes)
+
+    async def assign_complaint(self, complaint_id: str, assignee: str) -> bool:
+        return await self._run(self.db.assign_complaint, complaint_id, assignee)
+
+    async def delete_complaint(self, complaint_id: str) -> bool:
+        return await self._run(self.db.delete_complaint, complaint_id)
+
+    async def get_ward_zone_mapping(self, ward: str = None) -> List[dict]:
+        return await self._run(self.db.get_ward_zone_mapping, ward)
+
+    async def get_statistics(self) -> dict:
+        return await self._run(self.db.get_statistics)
+
+    async def get_statistics_delta(self, since_version: int) -> dict:
+        return await self._run(self.db.get_statistics_delta, since_version)
+
+    async def get_schema_version(self) -> int:
+        return await self._run(self.db.get_schema_version)
+
+    async def rebuild_search_index(self):
+        return await self._run(self.db.rebuild_search_index)
+
+    def get_pool_metrics(self) -> dict:
+        return self.db.get_pool_metrics()
+
+    def get_writer_metrics(self) -> dict:
+        return self.db.get_writer_metrics()
+
+    def close(self):
+        """Stop the executor after running queued calls"""
+        self._executor.shutdown(wait=True)
+
+
+# Singleton instance
+async_db_service = AsyncDatabaseService(get_db_service())
+
+
+def get_async_db_service() -> AsyncDatabaseService:
+    """Get the async database service instance"""
+    return async_db_service
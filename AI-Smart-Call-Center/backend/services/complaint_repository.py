@@ -0,0 +1,252 @@
+"""
+AI Smart Call Center - Complaint Repository
+Single read/write path for complaints: SQLite as the source of truth,
+fronted by a bounded in-memory hot set
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from models import Complaint, ComplaintRequest, ComplaintStatus
+from services.async_database_service import AsyncDatabaseService, get_async_db_service
+from services.id_allocator import ComplaintIdAllocator, get_id_allocator
+from utils.lru_cache import LRUCache
+
+
+# Statuses kept in the open tier of the hot set
+OPEN_STATUSES = (ComplaintStatus.PENDING, ComplaintStatus.IN_PROGRESS)
+
+
+class ComplaintRepository:
+    """
+    Complaint storage used by the API routes
+
+    Every write goes to SQLite first and then invalidates the cached copy;
+    reads by ID are served from the hot set and fall through to SQLite on
+    a miss. Nothing is kept only in memory, so complaints created before a
+    restart can be read, updated and deleted like any other.
+
+    The hot set has two bounded LRU tiers: open (pending / in-progress)
+    complaints, which callers keep coming back to, and recently used
+    resolved, closed or rejected ones. A busy stream of closed lookups
+    therefore never pushes open complaints out. Evicting only drops the
+    memory copy; the next read pages the complaint back in from SQLite.
+
+    The hot set is per process, so entries older than ttl_seconds are
+    checked against the row's updated_at before they are served; updates
+    and deletes made by other workers show up within the TTL.
+    """
+
+    def __init__(self, db: AsyncDatabaseService, open_size: int = 50000, closed_size: int = 10000,
+                 ttl_seconds: float = 5.0, id_allocator: Optional[ComplaintIdAllocator] = None):
+        self.db = db
+        self.id_allocator = id_allocator or get_id_allocator()
+        # Both tiers map complaint_id -> (Complaint, time.monotonic() when cached or revalidated)
+        self.open_cache = LRUCache(max_entries=open_size)
+        self.closed_cache = LRUCache(max_entries=closed_size)
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        # Bumped on every invalidation; a read-through fill is skipped if a
+        # write happened while it was loading, so stale rows never get cached
+        self._write_seq = 0
+        self._hits = 0
+        self._reloads = 0
+        self._reload_misses = 0
+        self._revalidations = 0
+        self._stale_entries = 0
+
+    def _build_complaints(self, items: List[ComplaintRequest]) -> List[Complaint]:
+        """
+        Allocate IDs for and create new pending Complaints from request data
+
+        ID allocation can reserve a block in SQLite, so this runs on the
+        database executor, never on the event loop.
+        """
+        ids = self.id_allocator.allocate_many([(item.complaint_type, item.ward) for item in items])
+        return [self._new_complaint(complaint_id, item) for complaint_id, item in zip(ids, items)]
+
+    @staticmethod
+    def _new_complaint(complaint_id: str, data: ComplaintRequest) -> Complaint:
+        """Create a new pending Complaint from request data"""
+        now = datetime.now()
+        return Complaint(
+            complaint_id=complaint_id,
+            complaint_type=data.complaint_type,
+            sub_category=data.sub_category,
+            house_no=data.house_no,
+            area=data.area,
+            ward=data.ward,
+            zone=data.zone,
+            description=data.description,
+            phone_number=data.phone_number,
+            latitude=data.latitude,
+            longitude=data.longitude,
+            status=ComplaintStatus.PENDING,
+            created_at=now,
+            updated_at=now
+        )
+
+    def _cache(self, complaint: Complaint):
+        """Keep a complaint in the hot set tier matching its status"""
+        entry = (complaint, time.monotonic())
+        if complaint.status in OPEN_STATUSES:
+            self.open_cache.put(complaint.complaint_id, entry)
+        else:
+            self.closed_cache.put(complaint.complaint_id, entry)
+
+    def _drop(self, complaint_id: str):
+        """Remove a complaint from both hot set tiers"""
+        self.open_cache.invalidate(complaint_id)
+        self.closed_cache.invalidate(complaint_id)
+
+    def _invalidate(self, complaint_id: str):
+        """Drop a complaint from the hot set after a write"""
+        self._write_seq += 1
+        self._drop(complaint_id)
+
+    async def create(self, data: ComplaintRequest) -> Complaint:
+        """
+        Create and persist a new complaint
+
+        Raises:
+            RuntimeError: If the complaint could not be saved
+        """
+        complaint, = await self.db.run_in_db_executor(self._build_complaints, [data])
+        if not await self.db.save_complaint(complaint):
+            raise RuntimeError("Failed to save complaint")
+        self._cache(complaint)
+        return complaint
+
+    async def create_many(self, items: List[ComplaintRequest]) -> List[Complaint]:
+        """
+        Create and persist many complaints in a single transaction
+
+        Raises:
+            RuntimeError: If the batch could not be saved (nothing is stored)
+        """
+        complaints = await self.db.run_in_db_executor(self._build_complaints, items)
+        saved = await self.db.save_complaints(complaints)
+        if saved != len(complaints):
+            raise RuntimeError(f"Failed to save {len(complaints)} complaints")
+        for complaint in complaints:
+            self._cache(complaint)
+        return complaints
+
+    async def get(self, complaint_id: str) -> Optional[Complaint]:
+        """Get a complaint by ID, from the hot set when possible"""
+        entry = self.open_cache.get(complaint_id) or self.closed_cache.get(complaint_id)
+        if entry is not None:
+            complaint, cached_at = entry
+            if time.monotonic() - cached_at < self.ttl_seconds:
+                self._hits += 1
+                return complaint
+
+            # Past its TTL: one indexed updated_at lookup tells whether
+            # another process changed or deleted the complaint meanwhile
+            seq = self._write_seq
+            self._revalidations += 1
+            updated_at = await self.db.get_complaint_updated_at(complaint_id)
+            if updated_at == complaint.updated_at and seq == self._write_seq:
+                self._cache(complaint)
+                self._hits += 1
+                return complaint
+            self._stale_entries += 1
+            self._drop(complaint_id)
+
+        seq = self._write_seq
+        complaint = await self.db.get_complaint(complaint_id)
+        if complaint is None:
+            self._reload_misses += 1
+            return None
+        self._reloads += 1
+        if seq == self._write_seq:
+            self._cache(complaint)
+        return complaint
+
+    async def update_status(
+        self,
+        complaint_id: str,
+        status: ComplaintStatus,
+        notes: Optional[str] = None
+    ) -> Optional[Complaint]:
+        """
+        Update complaint status
+
+        Returns:
+            Updated Complaint, or None if it does not exist
+        """
+        updated = await self.db.update_complaint_status(complaint_id, status.value, notes)
+        self._invalidate(complaint_id)
+        if not updated:
+            return None
+        return await self.get(complaint_id)
+
+    async def delete(self, complaint_id: str) -> bool:
+        """Delete a complaint; False if it does not exist"""
+        deleted = await self.db.delete_complaint(complaint_id)
+        self._invalidate(complaint_id)
+        return deleted
+
+    async def warm_start(self) -> dict:
+        """
+        Fill the open tier of the hot set with the newest open complaints
+
+        Open complaints are the ones callers and staff keep coming back to,
+        so after a restart their first lookups hit memory. Loads at most as
+        many as the open tier holds. Meant to run once at startup.
+
+        Returns:
+            Dictionary with rows loaded, seconds taken and rows per second
+        """
+        started = time.perf_counter()
+        complaints = await self.db.get_open_complaints(self.open_cache.max_entries)
+        # Oldest first, so the newest end up most recently used
+        for complaint in reversed(complaints):
+            self._cache(complaint)
+
+        seconds = time.perf_counter() - started
+        return {
+            'rows': len(complaints),
+            'seconds': round(seconds, 3),
+            'rows_per_second': int(len(complaints) / seconds) if seconds > 0 else 0
+        }
+
+    def get_cache_metrics(self) -> dict:
+        """Get hot set residency, hit rate, eviction and reload counters"""
+        open_metrics = self.open_cache.get_metrics()
+        closed_metrics = self.closed_cache.get_metrics()
+        lookups = self._hits + self._reloads + self._reload_misses
+        return {
+            'resident': open_metrics['entries'] + closed_metrics['entries'],
+            'resident_open': open_metrics['entries'],
+            'resident_closed': closed_metrics['entries'],
+            'max_open': open_metrics['max_entries'],
+            'max_closed': closed_metrics['max_entries'],
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self._hits,
+            'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            'evictions_open': open_metrics['evictions'],
+            'evictions_closed': closed_metrics['evictions'],
+            'reloads': self._reloads,
+            'reload_misses': self._reload_misses,
+            'revalidations': self._revalidations,
+            'stale_entries': self._stale_entries,
+            'invalidations': open_metrics['invalidations'] + closed_metrics['invalidations']
+        }
+
+
+# Singleton instance; COMPLAINT_OPEN_CACHE_SIZE bounds resident open complaints,
+# COMPLAINT_CACHE_SIZE resident resolved / closed / rejected ones, and
+# COMPLAINT_CACHE_TTL_SECONDS how long an entry is served before revalidation
+complaint_repository = ComplaintRepository(
+    get_async_db_service(),
+    open_size=int(os.getenv("COMPLAINT_OPEN_CACHE_SIZE", "50000")),
+    closed_size=int(os.getenv("COMPLAINT_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("COMPLAINT_CACHE_TTL_SECONDS", "5"))
+)
+
+
+def get_complaint_repository() -> ComplaintRepository:
+    """Get the complaint repository instance"""
+    return complaint_repository
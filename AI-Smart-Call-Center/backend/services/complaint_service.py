@@ -10,10 +10,16 @@ from models import Complaint, ComplaintStatus, ComplaintRequest
 
 
 class ComplaintService:
-    """Service class for complaint management"""
+    """
+    Service class for complaint management
+    
+    Holds complaints in memory only. The API stores complaints through
+    ComplaintRepository (SQLite plus a bounded hot set); this service is an
+    in-process store for tools and scripts that do not need persistence.
+    """
     
     def __init__(self):
-        # In-memory storage (replace with database in production)
+        # In-memory storage; see ComplaintRepository for the persistent store
         self.complaints: Dict[str, Complaint] = {}
     
     def create_complaint(self, data: ComplaintRequest) -> Complaint:
@@ -26,17 +32,20 @@ class ComplaintService:
         Returns:
             Created Complaint object
         """
-        complaint_id = generate_complaint_id()
+        complaint_id = generate_complaint_id(data.complaint_type, data.ward)
         
         complaint = Complaint(
             complaint_id=complaint_id,
             complaint_type=data.complaint_type,
+            sub_category=data.sub_category,
             house_no=data.house_no,
             area=data.area,
             ward=data.ward,
             zone=data.zone,
             description=data.description,
             phone_number=data.phone_number,
+            latitude=data.latitude,
+            longitude=data.longitude,
             status=ComplaintStatus.PENDING,
             created_at=datetime.now(),
             updated_at=datetime.now()
@@ -172,24 +181,17 @@ class ComplaintService:
         Returns:
             Dictionary with statistics
         """
-        total = len(self.complaints)
-        
         stats = {
-            'total': total,
-            'by_status': {},
+            'total': len(self.complaints),
+            'by_status': {status.value: 0 for status in ComplaintStatus},
             'by_type': {}
         }
         
-        # Count by status
-        for status in ComplaintStatus:
-            count = len([c for c in self.complaints.values() if c.status == status])
-            stats['by_status'][status.value] = count
-        
-        # Count by type
-        types = set(c.complaint_type for c in self.complaints.values())
-        for complaint_type in types:
-            count = len([c for c in self.complaints.values() if c.complaint_type == complaint_type])
-            stats['by_type'][complaint_type] = count
+        # Count by status and type in a single pass
+        for c in self.complaints.values():
+            status = c.status.value
+            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+            stats['by_type'][c.complaint_type] = stats['by_type'].get(c.complaint_type, 0) + 1
         
         return stats
     
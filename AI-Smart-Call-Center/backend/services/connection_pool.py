@@ -0,0 +1,176 @@
+"""
+AI Smart Call Center - SQLite Connection Pool
+Reusable WAL-mode connections shared by the database services
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections
+
+    Every connection is opened once with WAL journaling, synchronous=NORMAL,
+    a larger page cache and a per-connection prepared statement cache, then
+    handed out repeatedly. WAL lets readers keep working while the IVR writes
+    complaints; concurrent writers wait on SQLite's busy timeout.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 5,
+        checkout_timeout: float = 30.0,
+        busy_timeout_ms: int = 5000,
+        cache_size_kb: int = 16384,
+        statement_cache_size: int = 256
+    ):
+        self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.checkout_timeout = checkout_timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.statement_cache_size = statement_cache_size
+
+        # LIFO keeps the most recently used (warmest) connection in play
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._checkout_timeouts = 0
+        self._busy_timeouts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new pooled connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, open a new one, or wait for a release"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise PoolTimeoutError("Connection pool is closed")
+            if self._opened < self.pool_size:
+                self._opened += 1
+                open_new = True
+            else:
+                open_new = False
+
+        if open_new:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        started = time.perf_counter()
+        with self._lock:
+            self._waits += 1
+        try:
+            conn = self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            with self._lock:
+                self._checkout_timeouts += 1
+            raise PoolTimeoutError(
+                f"No database connection available after {self.checkout_timeout}s"
+            )
+        finally:
+            with self._lock:
+                self._wait_time += time.perf_counter() - started
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, discarding any open transaction"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block"""
+        conn = self._acquire()
+        with self._lock:
+            self._checkouts += 1
+        try:
+            yield conn
+        except sqlite3.OperationalError as e:
+            message = str(e).lower()
+            if 'locked' in message or 'busy' in message:
+                with self._lock:
+                    self._busy_timeouts += 1
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close every idle connection; checked-out ones close on release"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def get_metrics(self) -> Dict:
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'pool_size': self.pool_size,
+                'open_connections': self._opened,
+                'idle_connections': idle,
+                'in_use_connections': self._opened - idle,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'total_wait_ms': round(self._wait_time * 1000, 3),
+                'checkout_timeouts': self._checkout_timeouts,
+                'busy_timeouts': self._busy_timeouts
+            }
@@ -0,0 +1,96 @@
+"""
+AI Smart Call Center - IVR Conversation History
+Bounded per-session history of compact turn tuples, with older turns and
+finished transcripts kept as compressed blobs outside the session
+"""
+
+import marshal
+import os
+import time
+import zlib
+from typing import Dict, List, Tuple
+
+ROLE_USER = 0
+ROLE_ASSISTANT = 1
+ROLE_NAMES = ('user', 'assistant')
+
+# Live turns kept per session; when exceeded, the oldest half is compressed
+HISTORY_SIZE = int(os.getenv("IVR_HISTORY_SIZE", "40"))
+
+# (role code, milliseconds since the session started, text)
+Entry = Tuple[int, int, str]
+
+
+def now_ms() -> int:
+    """Wall-clock milliseconds (sessions move between workers, so no monotonic clock)"""
+    return int(time.time() * 1000)
+
+
+def compress_entries(entries: List[Entry]) -> bytes:
+    """Serialize and compress a list of history entries"""
+    return zlib.compress(marshal.dumps(list(entries)))
+
+
+def decompress_entries(data: bytes) -> List[Entry]:
+    """Inverse of compress_entries"""
+    return marshal.loads(zlib.decompress(data))
+
+
+def record_turn(session: Dict, role: int, text: str, size: int = HISTORY_SIZE, store=None):
+    """
+    Append one turn to a session's history
+
+    Offsets never go backwards even if workers' clocks disagree. Once the
+    live list holds more than size entries, its oldest entries are
+    compressed into one chunk, so the live part stays small while the
+    transcript stays complete (repeated prompts compress to a few bytes
+    each).
+
+    Chunks go to store (DatabaseService.save_history_chunk), numbered by
+    session["history_chunks"], so the session itself, which is serialized
+    on every put and journal append, does not grow with the call. Without
+    a store, or if saving fails, the chunk stays in session["history_spill"].
+    """
+    history = session["conversation_history"]
+    offset = max(0, now_ms() - session.setdefault("started_ms", now_ms()))
+    if history:
+        offset = max(offset, history[-1][1])
+    history.append((role, offset, text))
+
+    if len(history) > size:
+        cut = len(history) - size // 2
+        chunk = compress_entries(history[:cut])
+        seq = session.get("history_chunks", 0)
+        # Stored chunks precede in-session ones, so once a chunk stays in the
+        # session every later one does too
+        if (store is not None and not session.get("history_spill")
+                and store.save_history_chunk(session["session_id"], seq, cut, chunk)):
+            session["history_chunks"] = seq + 1
+        else:
+            session.setdefault("history_spill", []).append(chunk)
+        session["history_spilled"] = session.get("history_spilled", 0) + cut
+        del history[:cut]
+
+
+def transcript(session: Dict, store=None) -> List[Entry]:
+    """
+    Every turn of a session, oldest first
+
+    Reads the session's stored chunks from store, so call it off the event
+    loop when one is given.
+    """
+    entries: List[Entry] = []
+    count = session.get("history_chunks", 0)
+    chunks: List[bytes] = store.get_history_chunks(session["session_id"], count) if store and count else []
+    for chunk in chunks + list(session.get("history_spill", ())):
+        entries.extend(decompress_entries(chunk))
+    entries.extend(session["conversation_history"])
+    return entries
+
+
+def page(entries: List[Entry], offset: int, limit: int) -> List[Dict]:
+    """One page of entries in API form"""
+    return [
+        {"role": ROLE_NAMES[role], "offset_ms": offset_ms, "text": text}
+        for role, offset_ms, text in entries[offset:offset + limit]
+    ]
@@ -5,29 +5,301 @@ SQLite database for complaint and location data storage
 
 import sqlite3
 import os
+import logging
+import re
+import json
+import base64
+import math
 from datetime import datetime
-from typing import List, Optional
-from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from models import Complaint, ComplaintStatus
+from services.connection_pool import ConnectionPool
+from services.group_commit import GroupCommitWriter
+from services.migrations import apply_migrations, get_schema_version, ROLLUP_DIMENSIONS
+from utils.phone import normalize_phone
+
+
+logger = logging.getLogger(__name__)
+
+
+# Hot-path statements; pooled connections cache prepared statements by SQL
+# text, so these are parsed once per connection rather than once per call.
+# Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row without
+# firing delete triggers, which would leave stale entries in complaints_fts.
+INSERT_COMPLAINT_SQL = '''
+    INSERT INTO complaints 
+    (complaint_id, complaint_type, house_no, area, ward, zone, 
+     description, phone_number, status, priority, created_at, 
+     updated_at, assigned_to, resolution_notes, sub_category, phone_key,
+     latitude, longitude)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(complaint_id) DO UPDATE SET
+        complaint_type = excluded.complaint_type,
+        sub_category = excluded.sub_category,
+        house_no = excluded.house_no,
+        area = excluded.area,
+        ward = excluded.ward,
+        zone = excluded.zone,
+        description = excluded.description,
+        phone_number = excluded.phone_number,
+        phone_key = excluded.phone_key,
+        status = excluded.status,
+        priority = excluded.priority,
+        created_at = excluded.created_at,
+        updated_at = excluded.updated_at,
+        assigned_to = excluded.assigned_to,
+        resolution_notes = excluded.resolution_notes,
+        latitude = excluded.latitude,
+        longitude = excluded.longitude
+'''
+SELECT_COMPLAINT_SQL = 'SELECT * FROM complaints WHERE complaint_id = ?'
+SELECT_UPDATED_AT_SQL = 'SELECT updated_at FROM complaints WHERE complaint_id = ?'
+SELECT_ALL_COMPLAINTS_SQL = 'SELECT * FROM complaints ORDER BY created_at DESC'
+SELECT_BY_PHONE_SQL = '''
+    SELECT * FROM complaints WHERE phone_key = ?
+    ORDER BY created_at DESC, complaint_id DESC LIMIT ?
+'''
+SELECT_OPEN_BY_PHONE_SQL = '''
+    SELECT * FROM complaints WHERE phone_key = ? AND status IN ('pending', 'in_progress')
+    ORDER BY created_at DESC, complaint_id DESC LIMIT ?
+'''
+SELECT_OPEN_COMPLAINTS_SQL = '''
+    SELECT * FROM complaints WHERE status IN ('pending', 'in_progress')
+    ORDER BY created_at DESC, complaint_id DESC LIMIT ?
+'''
+UPDATE_STATUS_SQL = '''
+    UPDATE complaints 
+    SET status = ?, updated_at = ?, resolution_notes = COALESCE(?, resolution_notes)
+    WHERE complaint_id = ?
+'''
+ASSIGN_COMPLAINT_SQL = '''
+    UPDATE complaints
+    SET assigned_to = ?, status = 'in_progress', updated_at = ?
+    WHERE complaint_id = ?
+'''
+DELETE_COMPLAINT_SQL = 'DELETE FROM complaints WHERE complaint_id = ?'
+INSERT_TRANSCRIPT_SQL = '''
+    INSERT OR REPLACE INTO ivr_transcripts
+    (session_id, complaint_id, started_at, ended_at, entries, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+SELECT_TRANSCRIPT_SQL = 'SELECT * FROM ivr_transcripts WHERE session_id = ?'
+INSERT_HISTORY_CHUNK_SQL = '''
+    INSERT OR REPLACE INTO ivr_history_chunks (session_id, seq, entries, data)
+    VALUES (?, ?, ?, ?)
+'''
+SELECT_HISTORY_CHUNKS_SQL = '''
+    SELECT data FROM ivr_history_chunks WHERE session_id = ? AND seq < ? ORDER BY seq
+'''
+DELETE_HISTORY_CHUNKS_SQL = 'DELETE FROM ivr_history_chunks WHERE session_id = ?'
+RESERVE_ID_BLOCK_SQL = '''
+    INSERT INTO complaint_id_sequences (scope, last_value) VALUES (?, ?)
+    ON CONFLICT (scope) DO UPDATE SET last_value = last_value + excluded.last_value
+    RETURNING last_value
+'''
+# One statement each, so the version row and the buckets come from the same snapshot
+SELECT_COUNTERS_SQL = '''
+    SELECT 'version', '', version FROM complaint_counters_version
+    UNION ALL
+    SELECT dimension, bucket, count FROM complaint_counters WHERE count > 0
+'''
+SELECT_COUNTER_CHANGES_SQL = '''
+    SELECT 'version', '', version FROM complaint_counters_version
+    UNION ALL
+    SELECT dimension, bucket, count FROM complaint_counters WHERE version > ?
+'''
+SELECT_ROLLUPS_SQL = '''
+    SELECT bucket_start, value, count FROM complaint_rollups
+    WHERE granularity = ? AND dimension = ? AND bucket_start >= ? AND bucket_start <= ?
+      AND count > 0
+'''
+SEARCH_COMPLAINTS_SQL = '''
+    SELECT complaints.* FROM complaints_fts
+    JOIN complaints ON complaints.rowid = complaints_fts.rowid
+    WHERE complaints_fts MATCH ?
+    ORDER BY bm25(complaints_fts, 10.0, 3.0, 2.0, 1.0, 5.0)
+    LIMIT ? OFFSET ?
+'''
+NEARBY_COMPLAINTS_SQL = '''
+    SELECT complaints.* FROM complaints_geo
+    JOIN complaints ON complaints.rowid = complaints_geo.id
+    WHERE complaints_geo.max_lat >= ? AND complaints_geo.min_lat <= ?
+      AND complaints_geo.max_lon >= ? AND complaints_geo.min_lon <= ?
+'''
+NEARBY_COMPLAINTS_FALLBACK_SQL = '''
+    SELECT * FROM complaints
+    WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+'''
+SEARCH_COMPLAINTS_FALLBACK_SQL = '''
+    SELECT * FROM complaints
+    WHERE complaint_id LIKE ? OR complaint_type LIKE ? OR area LIKE ?
+       OR description LIKE ? OR phone_number LIKE ?
+    ORDER BY created_at DESC
+    LIMIT ? OFFSET ?
+'''
+
+# Rollup bucket key format per granularity (matches migrations.ROLLUP_GRANULARITIES)
+ROLLUP_BUCKET_FORMATS = {
+    'hour': '%Y-%m-%dT%H:00:00',
+    'day': '%Y-%m-%d',
+}
+
+# Columns that can be filtered by exact match on list/export queries
+COMPLAINT_FILTER_COLUMNS = ('status', 'complaint_type', 'ward', 'zone')
+MAX_PAGE_SIZE = 500
+
+# Column order of exported complaint rows
+EXPORT_COLUMNS = (
+    'complaint_id', 'complaint_type', 'sub_category', 'house_no', 'area', 'ward',
+    'zone', 'description', 'phone_number', 'status', 'priority', 'created_at',
+    'updated_at', 'assigned_to', 'resolution_notes', 'latitude', 'longitude'
+)
+
+# Mean Earth radius and the length of one degree of latitude, in metres
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+MAX_NEARBY_RADIUS_M = 50000
+
+
+def encode_cursor(created_at: str, complaint_id: str) -> str:
+    """Encode a (created_at, complaint_id) position as an opaque cursor"""
+    raw = json.dumps([created_at, complaint_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, complaint_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(complaint_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, complaint_id
+
+
+def to_local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timezone-aware datetime to naive local time, as complaints are stored"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def build_complaint_filters(
+    filters: Optional[Dict] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Tuple[List[str], List]:
+    """
+    Build WHERE clauses for complaint list queries
+    
+    Args:
+        filters: Exact-match values keyed by COMPLAINT_FILTER_COLUMNS
+        created_from: Inclusive lower bound on created_at
+        created_to: Exclusive upper bound on created_at
+    
+    created_at is stored as naive local time, so aware bounds (Z, +05:30)
+    are converted to local time before the string comparison.
+    
+    Returns:
+        Tuple of (clauses, params)
+    """
+    clauses = []
+    params = []
+    
+    for column in COMPLAINT_FILTER_COLUMNS:
+        value = (filters or {}).get(column)
+        if value:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    
+    created_from, created_to = to_local_naive(created_from), to_local_naive(created_to)
+    if created_from:
+        clauses.append('created_at >= ?')
+        params.append(created_from.isoformat())
+    if created_to:
+        clauses.append('created_at < ?')
+        params.append(created_to.isoformat())
+    
+    return clauses, params
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two WGS84 points, in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lon, max_lon) enclosing a circle around a point
+    
+    Slightly generous near the poles and the antimeridian, which only adds
+    candidates that the exact distance check then drops.
+    """
+    dlat = radius_m / METRES_PER_DEGREE
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return (max(-90.0, lat - dlat), min(90.0, lat + dlat),
+            max(-180.0, lon - dlon), min(180.0, lon + dlon))
+
+
+def build_fts_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression
+    
+    Every word becomes a quoted prefix term, so operators and punctuation in
+    user input are never interpreted and partial words still match
+    ("पान" finds "पानी", "98765" finds the full number).
+    
+    Returns:
+        MATCH expression, or None if the query has no searchable words
+    """
+    terms = re.findall(r'[^\s"\'`.,;:!?()\[\]{}*^+\-/\\]+', query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
 
 
 class DatabaseService:
     """Service class for SQLite database operations"""
     
-    def __init__(self, db_path: str = "complaints.db"):
+    def __init__(
+        self,
+        db_path: str = "complaints.db",
+        pool_size: int = 5,
+        busy_timeout_ms: int = 5000,
+        cache_size_kb: int = 16384
+    ):
         self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            pool_size=pool_size,
+            busy_timeout_ms=busy_timeout_ms,
+            cache_size_kb=cache_size_kb
+        )
+        self.fts_enabled = False
+        self.geo_enabled = False
         self._initialize_database()
+        self.writer = GroupCommitWriter(self.pool, INSERT_COMPLAINT_SQL)
     
-    @contextmanager
     def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Context manager that checks a connection out of the pool"""
+        return self.pool.connection()
+    
+    def get_pool_metrics(self) -> dict:
+        """Get connection pool usage metrics"""
+        return self.pool.get_metrics()
+    
+    def close(self):
+        """Flush pending writes and close all pooled connections"""
+        self.writer.close()
+        self.pool.close()
     
     def _initialize_database(self):
         """Initialize database with required tables"""
@@ -86,46 +358,102 @@ class DatabaseService:
                 )
             
             conn.commit()
+            
+            # Bring indexes and later schema changes up to date
+            apply_migrations(conn)
+            
+            self.fts_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'complaints_fts'"
+            ).fetchone() is not None
+            self.geo_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'complaints_geo'"
+            ).fetchone() is not None
+    
+    def get_schema_version(self) -> int:
+        """Get the applied schema migration version"""
+        with self._get_connection() as conn:
+            return get_schema_version(conn)
+    
+    def _complaint_to_params(self, complaint: Complaint) -> tuple:
+        """Convert a Complaint into INSERT_COMPLAINT_SQL parameters"""
+        return (
+            complaint.complaint_id,
+            complaint.complaint_type,
+            complaint.house_no,
+            complaint.area,
+            complaint.ward,
+            complaint.zone,
+            complaint.description,
+            complaint.phone_number,
+            complaint.status.value if hasattr(complaint.status, 'value') else complaint.status,
+            complaint.priority,
+            complaint.created_at.isoformat() if hasattr(complaint.created_at, 'isoformat') else str(complaint.created_at),
+            complaint.updated_at.isoformat() if hasattr(complaint.updated_at, 'isoformat') else str(complaint.updated_at),
+            complaint.assigned_to,
+            complaint.resolution_notes,
+            complaint.sub_category,
+            normalize_phone(complaint.phone_number),
+            complaint.latitude,
+            complaint.longitude
+        )
     
     def save_complaint(self, complaint: Complaint) -> bool:
-        """Save a complaint to database"""
+        """
+        Save a complaint to database
+        
+        The row is handed to the group-commit writer, which shares one
+        transaction between all concurrent callers; this call returns once
+        the complaint's own transaction has committed.
+        """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO complaints 
-                    (complaint_id, complaint_type, house_no, area, ward, zone, 
-                     description, phone_number, status, priority, created_at, 
-                     updated_at, assigned_to, resolution_notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    complaint.complaint_id,
-                    complaint.complaint_type,
-                    complaint.house_no,
-                    complaint.area,
-                    complaint.ward,
-                    complaint.zone,
-                    complaint.description,
-                    complaint.phone_number,
-                    complaint.status.value if hasattr(complaint.status, 'value') else complaint.status,
-                    complaint.priority,
-                    complaint.created_at.isoformat() if hasattr(complaint.created_at, 'isoformat') else str(complaint.created_at),
-                    complaint.updated_at.isoformat() if hasattr(complaint.updated_at, 'isoformat') else str(complaint.updated_at),
-                    complaint.assigned_to,
-                    complaint.resolution_notes
-                ))
-                conn.commit()
-                return True
+            self.writer.write(self._complaint_to_params(complaint))
+            return True
         except Exception as e:
             print(f"Error saving complaint: {e}")
             return False
     
+    def save_complaints(self, complaints: List[Complaint], chunk_size: int = 1000) -> int:
+        """
+        Save many complaints in one transaction, one executemany per chunk
+        
+        All or nothing: if any chunk fails the whole batch is rolled back,
+        so a caller never sees some rows stored without their IDs.
+        
+        Args:
+            complaints: Complaints to insert or update
+            chunk_size: Rows per executemany call
+            
+        Returns:
+            Number of complaints saved (0 if the batch was rolled back)
+        """
+        try:
+            with self._get_connection() as conn:
+                try:
+                    for start in range(0, len(complaints), chunk_size):
+                        chunk = complaints[start:start + chunk_size]
+                        conn.executemany(
+                            INSERT_COMPLAINT_SQL,
+                            [self._complaint_to_params(c) for c in chunk]
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception:
+            logger.exception("Error saving %d complaints; batch rolled back", len(complaints))
+            return 0
+        return len(complaints)
+    
+    def get_writer_metrics(self) -> dict:
+        """Get group-commit writer metrics"""
+        return self.writer.get_metrics()
+    
     def get_complaint(self, complaint_id: str) -> Optional[Complaint]:
         """Get a complaint by ID"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM complaints WHERE complaint_id = ?', (complaint_id,))
+                cursor.execute(SELECT_COMPLAINT_SQL, (complaint_id,))
                 row = cursor.fetchone()
                 
                 if row:
@@ -135,13 +463,24 @@ class DatabaseService:
             print(f"Error getting complaint: {e}")
             return None
     
+    def get_complaint_updated_at(self, complaint_id: str) -> Optional[datetime]:
+        """Get when a complaint last changed (None if missing); a primary key lookup"""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(SELECT_UPDATED_AT_SQL, (complaint_id,)).fetchone()
+            if row and row[0]:
+                return datetime.fromisoformat(row[0])
+        except Exception as e:
+            print(f"Error getting complaint updated_at: {e}")
+        return None
+    
     def get_all_complaints(self) -> List[Complaint]:
         """Get all complaints"""
         complaints = []
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM complaints ORDER BY created_at DESC')
+                cursor.execute(SELECT_ALL_COMPLAINTS_SQL)
                 rows = cursor.fetchall()
                 
                 for row in rows:
@@ -153,28 +492,424 @@ class DatabaseService:
         
         return complaints
     
+    def get_complaints_by_phone(
+        self,
+        phone: str,
+        open_only: bool = False,
+        limit: int = 50
+    ) -> List[Complaint]:
+        """
+        Get a caller's complaints, newest first, via the phone_key index
+        
+        Args:
+            phone: Phone number in any common format (normalized to E.164)
+            open_only: Only pending and in-progress complaints
+            limit: Maximum number of complaints, capped at MAX_PAGE_SIZE
+            
+        Returns:
+            List of complaints (empty if the number is not valid)
+        """
+        phone_key = normalize_phone(phone)
+        if not phone_key:
+            return []
+        
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = SELECT_OPEN_BY_PHONE_SQL if open_only else SELECT_BY_PHONE_SQL
+        complaints = []
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(query, (phone_key, limit)).fetchall()
+            
+            for row in rows:
+                complaint = self._row_to_complaint(row)
+                if complaint:
+                    complaints.append(complaint)
+        except Exception as e:
+            print(f"Error getting complaints by phone: {e}")
+        
+        return complaints
+    
+    def get_nearby_complaints(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float = 1000,
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Tuple[Complaint, float]]:
+        """
+        Get located complaints within radius_m of a point, nearest first
+        
+        Candidates come from the complaints_geo R*Tree (a bounding-box probe
+        that touches only the matching part of the tree); each is then
+        checked against the exact great-circle distance.
+        
+        Args:
+            lat: Latitude of the centre point
+            lon: Longitude of the centre point
+            radius_m: Search radius in metres, capped at MAX_NEARBY_RADIUS_M
+            status: Only complaints with this status
+            limit: Maximum number of complaints, capped at MAX_PAGE_SIZE
+            
+        Returns:
+            List of (complaint, distance in metres) tuples
+        """
+        radius_m = max(0.0, min(radius_m, MAX_NEARBY_RADIUS_M))
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = NEARBY_COMPLAINTS_SQL if self.geo_enabled else NEARBY_COMPLAINTS_FALLBACK_SQL
+        params = list(bounding_box(lat, lon, radius_m))
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+            
+            nearby = []
+            for row in rows:
+                distance = haversine_m(lat, lon, row['latitude'], row['longitude'])
+                if distance <= radius_m:
+                    nearby.append((distance, row))
+            nearby.sort(key=lambda item: item[0])
+            
+            results = []
+            for distance, row in nearby[:limit]:
+                complaint = self._row_to_complaint(row)
+                if complaint:
+                    results.append((complaint, distance))
+            return results
+        except Exception as e:
+            print(f"Error getting nearby complaints: {e}")
+            return []
+    
+    def list_complaints(
+        self,
+        filters: Optional[Dict] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Complaint], Optional[str]]:
+        """
+        Get one page of complaints, newest first, using keyset pagination
+        
+        Rows are ordered by (created_at, complaint_id) descending and the
+        cursor holds the last position seen, so every page is an index range
+        scan regardless of how deep into the table it is.
+        
+        Args:
+            filters: Exact-match filters (status, complaint_type, ward, zone)
+            created_from: Inclusive lower bound on created_at
+            created_to: Exclusive upper bound on created_at
+            cursor: Cursor returned with the previous page
+            limit: Page size, capped at MAX_PAGE_SIZE
+            
+        Returns:
+            Tuple of (complaints, next_cursor); next_cursor is None on the last page
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = build_complaint_filters(filters, created_from, created_to)
+        
+        if cursor:
+            clauses.append('(created_at, complaint_id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        query = (f'SELECT * FROM complaints {where} '
+                 f'ORDER BY created_at DESC, complaint_id DESC LIMIT ?')
+        params.append(limit + 1)
+        
+        complaints = []
+        next_cursor = None
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+            
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(last['created_at'], last['complaint_id'])
+            
+            for row in rows:
+                complaint = self._row_to_complaint(row)
+                if complaint:
+                    complaints.append(complaint)
+        except Exception as e:
+            print(f"Error listing complaints: {e}")
+        
+        return complaints, next_cursor
+    
+    def iter_complaint_rows(
+        self,
+        filters: Optional[Dict] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[tuple]:
+        """
+        Stream raw complaint rows (EXPORT_COLUMNS order), newest first
+        
+        Rows are read in keyset pages of batch_size, the same (created_at,
+        complaint_id) range scan list_complaints uses. The pooled connection
+        is returned after every page, so a slow download neither starves the
+        pool nor holds a read transaction open that blocks WAL checkpoints.
+        
+        Args:
+            filters: Exact-match filters (status, complaint_type, ward, zone)
+            created_from: Inclusive lower bound on created_at
+            created_to: Exclusive upper bound on created_at
+            batch_size: Rows fetched per page
+        """
+        clauses, params = build_complaint_filters(filters, created_from, created_to)
+        created_at_index = EXPORT_COLUMNS.index('created_at')
+        id_index = EXPORT_COLUMNS.index('complaint_id')
+        position = None
+        
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if position:
+                page_clauses.append('(created_at, complaint_id) < (?, ?)')
+                page_params.extend(position)
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ''
+            query = (f"SELECT {', '.join(EXPORT_COLUMNS)} FROM complaints {where} "
+                     f"ORDER BY created_at DESC, complaint_id DESC LIMIT ?")
+            page_params.append(batch_size)
+            
+            with self._get_connection() as conn:
+                rows = [tuple(row) for row in conn.execute(query, page_params).fetchall()]
+            
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            position = (rows[-1][created_at_index], rows[-1][id_index])
+    
+    def get_open_complaints(self, limit: int) -> List[Complaint]:
+        """
+        Get the newest pending / in-progress complaints
+        
+        Used to warm the repository hot set at startup, so it is bounded by
+        the hot set budget rather than MAX_PAGE_SIZE.
+        
+        Args:
+            limit: Maximum number of complaints
+        """
+        complaints = []
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(SELECT_OPEN_COMPLAINTS_SQL, (max(0, limit),)).fetchall()
+            
+            for row in rows:
+                complaint = self._row_to_complaint(row)
+                if complaint:
+                    complaints.append(complaint)
+        except Exception as e:
+            print(f"Error getting open complaints: {e}")
+        
+        return complaints
+    
+    def search_complaints(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Complaint], bool]:
+        """
+        Full-text search over complaint ID, type, area, description and phone
+        
+        Args:
+            query: Free-text search query (Latin, Devanagari or Gujarati)
+            limit: Page size, capped at MAX_PAGE_SIZE
+            offset: Number of ranked results to skip
+            
+        Returns:
+            Tuple of (complaints ranked best first, has_more)
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        
+        complaints = []
+        has_more = False
+        try:
+            with self._get_connection() as conn:
+                if self.fts_enabled:
+                    match = build_fts_query(query)
+                    if not match:
+                        return [], False
+                    rows = conn.execute(SEARCH_COMPLAINTS_SQL, (match, limit + 1, offset)).fetchall()
+                else:
+                    pattern = f"%{query}%"
+                    rows = conn.execute(
+                        SEARCH_COMPLAINTS_FALLBACK_SQL,
+                        (pattern,) * 5 + (limit + 1, offset)
+                    ).fetchall()
+            
+            has_more = len(rows) > limit
+            for row in rows[:limit]:
+                complaint = self._row_to_complaint(row)
+                if complaint:
+                    complaints.append(complaint)
+        except Exception as e:
+            print(f"Error searching complaints: {e}")
+        
+        return complaints, has_more
+    
+    def rebuild_search_index(self):
+        """Rebuild complaints_fts from the complaints table (e.g. after VACUUM)"""
+        if not self.fts_enabled:
+            return
+        with self._get_connection() as conn:
+            conn.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('rebuild')")
+            conn.commit()
+    
+    def get_timeseries(
+        self,
+        granularity: str,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        value: Optional[str] = None
+    ) -> Dict[str, List[dict]]:
+        """
+        Get complaint counts per time bucket from the rollup table
+        
+        Args:
+            granularity: 'hour' or 'day'
+            dimension: 'all' or one of ROLLUP_DIMENSIONS
+            start: Start of the range (its bucket is included)
+            end: End of the range (its bucket is included)
+            value: Only return this dimension value
+            
+        Returns:
+            Dictionary of dimension value -> [{'bucket', 'count'}] in time order
+        """
+        if granularity not in ROLLUP_BUCKET_FORMATS:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        if dimension != 'all' and dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Invalid dimension: {dimension}")
+        
+        bucket_format = ROLLUP_BUCKET_FORMATS[granularity]
+        query = SELECT_ROLLUPS_SQL
+        params = [granularity, dimension, start.strftime(bucket_format), end.strftime(bucket_format)]
+        if value is not None:
+            query += ' AND value = ?'
+            params.append(value)
+        
+        series: Dict[str, List[dict]] = {}
+        try:
+            with self._get_connection() as conn:
+                for bucket, bucket_value, count in conn.execute(query, params):
+                    series.setdefault(bucket_value, []).append({'bucket': bucket, 'count': count})
+        except Exception as e:
+            print(f"Error getting timeseries: {e}")
+        
+        return series
+    
     def update_complaint_status(self, complaint_id: str, status: str, notes: str = None) -> bool:
         """Update complaint status"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE complaints 
-                    SET status = ?, updated_at = ?, resolution_notes = COALESCE(?, resolution_notes)
-                    WHERE complaint_id = ?
-                ''', (status, datetime.now().isoformat(), notes, complaint_id))
+                cursor.execute(UPDATE_STATUS_SQL, (status, datetime.now().isoformat(), notes, complaint_id))
                 conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error updating complaint: {e}")
             return False
     
+    def assign_complaint(self, complaint_id: str, assignee: str) -> bool:
+        """Assign a complaint and mark it in progress"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(ASSIGN_COMPLAINT_SQL, (assignee, datetime.now().isoformat(), complaint_id))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error assigning complaint: {e}")
+            return False
+    
+    def reserve_id_block(self, scope: str, size: int) -> int:
+        """
+        Reserve the next size sequence numbers of a complaint ID scope
+        
+        A single upsert bumps the scope's high-water mark under SQLite's
+        write lock, so concurrent processes always get disjoint blocks.
+        Unlike the other writes, errors are raised: there is no safe
+        default for an ID.
+        
+        Returns:
+            Last number of the reserved block (the block is last - size + 1 .. last)
+        """
+        with self._get_connection() as conn:
+            last_value = conn.execute(RESERVE_ID_BLOCK_SQL, (scope, size)).fetchone()[0]
+            conn.commit()
+            return last_value
+    
+    def save_transcript(
+        self,
+        session_id: str,
+        complaint_id: Optional[str],
+        started_at: Optional[str],
+        entries: int,
+        data: bytes
+    ) -> bool:
+        """
+        Store the compressed transcript of an ended IVR session
+        
+        The session's history chunks are deleted in the same transaction,
+        since the transcript now holds their turns.
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(INSERT_TRANSCRIPT_SQL, (
+                    session_id, complaint_id, started_at,
+                    datetime.now().isoformat(), entries, data
+                ))
+                conn.execute(DELETE_HISTORY_CHUNKS_SQL, (session_id,))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving transcript: {e}")
+            return False
+    
+    def save_history_chunk(self, session_id: str, seq: int, entries: int, data: bytes) -> bool:
+        """Store one compressed chunk of a live IVR session's older turns"""
+        try:
+            with self._get_connection() as conn:
+                conn.execute(INSERT_HISTORY_CHUNK_SQL, (session_id, seq, entries, data))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving history chunk: {e}")
+            return False
+    
+    def get_history_chunks(self, session_id: str, count: int) -> List[bytes]:
+        """Get the first count compressed history chunks of a live IVR session, in order"""
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(SELECT_HISTORY_CHUNKS_SQL, (session_id, count)).fetchall()
+                return [row[0] for row in rows]
+        except Exception as e:
+            print(f"Error getting history chunks: {e}")
+            return []
+    
+    def get_transcript(self, session_id: str) -> Optional[dict]:
+        """Get an ended IVR session's transcript row (data still compressed)"""
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(SELECT_TRANSCRIPT_SQL, (session_id,)).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            print(f"Error getting transcript: {e}")
+            return None
+    
     def delete_complaint(self, complaint_id: str) -> bool:
         """Delete a complaint"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('DELETE FROM complaints WHERE complaint_id = ?', (complaint_id,))
+                cursor.execute(DELETE_COMPLAINT_SQL, (complaint_id,))
                 conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
@@ -198,49 +933,92 @@ class DatabaseService:
             print(f"Error getting ward-zone mapping: {e}")
             return []
     
+    def _read_counters(self, query: str, params: tuple = ()) -> Tuple[int, dict]:
+        """Run a counters query and shape its rows like get_statistics"""
+        version = 0
+        counts = {}
+        with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        for dimension, bucket, count in rows:
+            if dimension == 'version':
+                version = count
+            elif dimension == 'total':
+                counts['total'] = count
+            elif dimension == 'type_status':
+                # Bucket is '<complaint_type>|<status>'; statuses never contain '|'
+                complaint_type, _, status = bucket.rpartition('|')
+                counts.setdefault('by_type_status', {}).setdefault(complaint_type, {})[status] = count
+            else:
+                counts.setdefault(f'by_{dimension}', {})[bucket] = count
+        
+        return version, counts
+    
     def get_statistics(self) -> dict:
-        """Get complaint statistics from database"""
+        """
+        Get complaint statistics from database
+        
+        Reads the trigger-maintained complaint_counters table, so the cost
+        is proportional to the number of buckets, not the number of complaints.
+        'version' identifies the snapshot for get_statistics_delta.
+        """
         stats = {
             'total': 0,
-            'by_status': {},
+            'by_status': {status.value: 0 for status in ComplaintStatus},
             'by_type': {},
-            'by_zone': {}
+            'by_zone': {},
+            'by_ward': {},
+            'by_type_status': {},
+            'version': 0
         }
         
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Total count
-                cursor.execute('SELECT COUNT(*) FROM complaints')
-                stats['total'] = cursor.fetchone()[0]
-                
-                # Count by status
-                cursor.execute('SELECT status, COUNT(*) FROM complaints GROUP BY status')
-                for row in cursor.fetchall():
-                    stats['by_status'][row[0]] = row[1]
-                
-                # Count by type
-                cursor.execute('SELECT complaint_type, COUNT(*) FROM complaints GROUP BY complaint_type')
-                for row in cursor.fetchall():
-                    stats['by_type'][row[0]] = row[1]
-                
-                # Count by zone
-                cursor.execute('SELECT zone, COUNT(*) FROM complaints GROUP BY zone')
-                for row in cursor.fetchall():
-                    stats['by_zone'][row[0]] = row[1]
+            version, counts = self._read_counters(SELECT_COUNTERS_SQL)
+            stats['total'] = counts.pop('total', 0)
+            for key, buckets in counts.items():
+                stats[key].update(buckets)
+            stats['version'] = version
                     
         except Exception as e:
             print(f"Error getting statistics: {e}")
         
         return stats
     
+    def get_statistics_delta(self, since_version: int) -> dict:
+        """
+        Get only the counters that changed after a given version
+        
+        Args:
+            since_version: 'version' from a previous get_statistics or delta call
+            
+        Returns:
+            Dictionary with the current 'version', the 'since_version' used and
+            'changes', shaped like get_statistics but holding only the buckets
+            that changed (including ones that dropped to zero). A version from
+            the future, e.g. after the database was replaced, returns every
+            bucket with since_version -1.
+        """
+        delta = {'version': 0, 'since_version': since_version, 'changes': {}}
+        
+        try:
+            version, changes = self._read_counters(SELECT_COUNTER_CHANGES_SQL, (since_version,))
+            if since_version > version:
+                since_version = -1
+                version, changes = self._read_counters(SELECT_COUNTER_CHANGES_SQL, (since_version,))
+            delta = {'version': version, 'since_version': since_version, 'changes': changes}
+            
+        except Exception as e:
+            print(f"Error getting statistics delta: {e}")
+        
+        return delta
+    
     def _row_to_complaint(self, row) -> Optional[Complaint]:
         """Convert database row to Complaint object"""
         try:
             return Complaint(
                 complaint_id=row['complaint_id'],
                 complaint_type=row['complaint_type'],
+                sub_category=row['sub_category'] or '',
                 house_no=row['house_no'] or '',
                 area=row['area'] or '',
                 ward=row['ward'] or '',
@@ -252,7 +1030,9 @@ class DatabaseService:
                 created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.now(),
                 updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else datetime.now(),
                 assigned_to=row['assigned_to'],
-                resolution_notes=row['resolution_notes']
+                resolution_notes=row['resolution_notes'],
+                latitude=row['latitude'],
+                longitude=row['longitude']
             )
         except Exception as e:
             print(f"Error converting row to complaint: {e}")
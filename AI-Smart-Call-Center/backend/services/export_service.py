@@ -0,0 +1,55 @@
+"""
+AI Smart Call Center - Export Service
+Incremental CSV / NDJSON encoders for streaming complaint exports
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator, Sequence
+
+# Rows encoded per yielded chunk
+CHUNK_ROWS = 500
+
+
+def stream_csv(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encode rows as CSV (with header), yielding one chunk per CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON objects"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+        if len(lines) >= CHUNK_ROWS:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,169 @@
+"""
+AI Smart Call Center - Group Commit Writer
+Batches concurrent single-row writes into shared transactions
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Sequence, Tuple
+
+from services.connection_pool import ConnectionPool
+
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Background writer that commits many queued rows per transaction
+
+    Callers submit one row of parameters and block on their own Future. The
+    writer thread takes everything queued while the previous commit was
+    running (up to max_batch rows) and writes it with a single executemany,
+    so under load one fsync covers many complaints. If a batch fails, its
+    rows are retried one by one so each caller gets its own outcome.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        sql: str,
+        max_batch: int = 256,
+        max_delay_ms: float = 0.0
+    ):
+        self.pool = pool
+        self.sql = sql
+        self.max_batch = max(1, max_batch)
+        # Optional extra time to wait for stragglers before committing
+        self.max_delay = max_delay_ms / 1000
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+        # Metrics
+        self._batches = 0
+        self._rows = 0
+        self._failed_rows = 0
+        self._largest_batch = 0
+
+    def _ensure_started(self):
+        """Start the writer thread on first use"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="group-commit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, params: Sequence) -> Future:
+        """Queue one row; the Future resolves once its transaction commits"""
+        if self._stopped:
+            raise RuntimeError("Group commit writer is stopped")
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((params, future))
+        return future
+
+    def write(self, params: Sequence, timeout: float = None):
+        """Queue one row and wait until it is durable"""
+        return self.submit(params).result(timeout)
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        """Gather a batch starting with first; returns (batch, stop_requested)"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _run(self):
+        """Writer loop"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, stop = self._collect(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List):
+        """Commit a batch, falling back to per-row writes on failure"""
+        try:
+            with self.pool.connection() as conn:
+                try:
+                    conn.executemany(self.sql, [params for params, _ in batch])
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    self._flush_individually(conn, batch)
+                    return
+        except Exception as e:
+            # Could not even obtain a connection
+            for _, future in batch:
+                future.set_exception(e)
+            with self._lock:
+                self._failed_rows += len(batch)
+            return
+
+        for _, future in batch:
+            future.set_result(True)
+        with self._lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+
+    def _flush_individually(self, conn, batch: List):
+        """Write each row in its own transaction so errors stay per-caller"""
+        for params, future in batch:
+            try:
+                conn.execute(self.sql, params)
+                conn.commit()
+                future.set_result(True)
+                with self._lock:
+                    self._batches += 1
+                    self._rows += 1
+            except Exception as e:
+                conn.rollback()
+                future.set_exception(e)
+                with self._lock:
+                    self._failed_rows += 1
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued rows and stop the writer thread"""
+        self._stopped = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def get_metrics(self) -> Dict:
+        """Snapshot of writer counters"""
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'rows': self._rows,
+                'failed_rows': self._failed_rows,
+                'largest_batch': self._largest_batch,
+                'avg_batch_size': round(self._rows / self._batches, 2) if self._batches else 0,
+                'queued': self._queue.qsize()
+            }
@@ -0,0 +1,180 @@
+"""
+AI Smart Call Center - Complaint ID Allocator
+Collision-free VMC complaint IDs from per-ward, per-type, per-day sequences
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services.database_service import DatabaseService, get_db_service
+from services.vmc_service import get_vmc_service
+
+
+DEFAULT_TYPE_CODE = 'OT'
+
+
+def ward_code(ward: str) -> str:
+    """Two-digit ward number from a ward name such as 'Ward 5' ('00' if none)"""
+    match = re.search(r'\d+', ward or '')
+    return match.group().zfill(2) if match else '00'
+
+
+def format_complaint_id(scope: str, seq: int) -> str:
+    """
+    Human-readable complaint ID
+
+    Format: VMC-{TYPE}-W{WARD}-{YYYYMMDD}-{SEQ}
+    Example: VMC-SL-W01-20260121-001
+    """
+    return f"VMC-{scope}-{seq:03d}"
+
+
+class ComplaintIdAllocator:
+    """
+    Hands out complaint IDs numbered per (type, ward, day) scope
+
+    Sequence high-water marks live in SQLite (complaint_id_sequences). Each
+    process reserves block_size numbers at a time with one atomic upsert
+    and then allocates from memory, so IDs never repeat across processes or
+    restarts and only one write in block_size touches the database. Within
+    a process the numbers of a scope strictly increase; numbers left in a
+    block when a process exits are skipped, never reused.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseService,
+        type_codes: Optional[Dict[str, str]] = None,
+        block_size: int = 20
+    ):
+        self.db = db
+        self.type_codes = type_codes or {}
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        # scope -> [next number, last reserved number]
+        self._blocks: Dict[str, List[int]] = {}
+        self._day = ''
+        # Blocks are per process; a forked child must reserve its own
+        self._pid = os.getpid()
+
+        # Metrics
+        self._allocated = 0
+        self._reservations = 0
+
+    def scope(self, complaint_type: str, ward: str = '', day: str = None) -> str:
+        """Sequence scope for a complaint, e.g. 'SL-W01-20260121'"""
+        type_code = self.type_codes.get(complaint_type, DEFAULT_TYPE_CODE)
+        return f"{type_code}-W{ward_code(ward)}-{day or datetime.now().strftime('%Y%m%d')}"
+
+    def _start_day(self, day: str):
+        """Drop blocks after a fork or when the day changes (caller holds the lock)"""
+        if self._pid != os.getpid() or day != self._day:
+            # Forked, or yesterday's scopes can no longer be used
+            self._blocks.clear()
+            self._pid = os.getpid()
+            self._day = day
+
+    def allocate(self, complaint_type: str, ward: str = '') -> str:
+        """
+        Allocate the next complaint ID for a complaint type and ward
+
+        May write to SQLite to reserve a block, so async callers should run
+        it on an executor rather than the event loop.
+
+        Raises:
+            sqlite3.Error: If a new block could not be reserved
+        """
+        day = datetime.now().strftime('%Y%m%d')
+        scope = self.scope(complaint_type, ward, day)
+
+        with self._lock:
+            self._start_day(day)
+
+            block = self._blocks.get(scope)
+            if block is None or block[0] > block[1]:
+                last = self.db.reserve_id_block(scope, self.block_size)
+                block = self._blocks[scope] = [last - self.block_size + 1, last]
+                self._reservations += 1
+
+            seq = block[0]
+            block[0] += 1
+            self._allocated += 1
+
+        return format_complaint_id(scope, seq)
+
+    def allocate_many(self, keys: List[Tuple[str, str]]) -> List[str]:
+        """
+        Allocate IDs for many complaints at once
+
+        Numbers left in each scope's current block are used first; the rest
+        of a scope comes from one reservation sized to what the batch still
+        needs (at least block_size, keeping the remainder as the scope's new
+        block), so a bulk import costs one write per scope instead of one
+        per block_size complaints. May write to SQLite, like allocate().
+
+        Args:
+            keys: (complaint_type, ward) per complaint
+
+        Returns:
+            IDs in the same order as keys
+
+        Raises:
+            sqlite3.Error: If a block could not be reserved
+        """
+        day = datetime.now().strftime('%Y%m%d')
+        scopes = [self.scope(complaint_type, ward, day) for complaint_type, ward in keys]
+        needed: Dict[str, int] = {}
+        for scope in scopes:
+            needed[scope] = needed.get(scope, 0) + 1
+
+        with self._lock:
+            self._start_day(day)
+
+            # scope -> numbers for this batch, in increasing order
+            numbers: Dict[str, Iterator[int]] = {}
+            for scope, count in needed.items():
+                block = self._blocks.get(scope)
+                taken: List[range] = []
+                if block is not None and block[0] <= block[1]:
+                    take = min(count, block[1] - block[0] + 1)
+                    taken.append(range(block[0], block[0] + take))
+                    block[0] += take
+                    count -= take
+                if count:
+                    size = max(count, self.block_size)
+                    last = self.db.reserve_id_block(scope, size)
+                    first = last - size + 1
+                    taken.append(range(first, first + count))
+                    self._blocks[scope] = [first + count, last]
+                    self._reservations += 1
+                numbers[scope] = chain.from_iterable(taken)
+            self._allocated += len(scopes)
+
+        return [format_complaint_id(scope, next(numbers[scope])) for scope in scopes]
+
+    def get_metrics(self) -> dict:
+        """Get allocation counters"""
+        with self._lock:
+            return {
+                'allocated': self._allocated,
+                'block_reservations': self._reservations,
+                'block_size': self.block_size,
+                'open_blocks': len(self._blocks)
+            }
+
+
+# Singleton instance
+id_allocator = ComplaintIdAllocator(
+    get_db_service(),
+    {name: category['id'] for name, category in get_vmc_service().complaint_categories.items()},
+    block_size=int(os.getenv("COMPLAINT_ID_BLOCK_SIZE", "20"))
+)
+
+
+def get_id_allocator() -> ComplaintIdAllocator:
+    """Get the complaint ID allocator instance"""
+    return id_allocator
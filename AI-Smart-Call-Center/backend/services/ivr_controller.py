@@ -9,12 +9,19 @@ This is the core IVR brain that:
 3. Asks ONLY the next most relevant question
 4. Never asks unnecessary or repeated questions
 5. Works like a call-center IVR, not a chatbot
+
+States, transitions and prompts are defined in flows/complaint_flow.json
+and compiled by services/ivr_flow.py; this module supplies the actions
+that interpret what the caller said.
 """
 
 import json
 import re
 from typing import Dict, Optional, Tuple
 from datetime import datetime
+from utils.id_generator import generate_complaint_id, generate_session_id
+from services.conversation_history import record_turn, now_ms, ROLE_USER, ROLE_ASSISTANT
+from services.ivr_flow import ActionResult, FlowAction, Transition, load_flow
 
 # Try to import VMC service for location detection
 try:
@@ -22,6 +29,12 @@ try:
 except ImportError:
     get_vmc_service = None
 
+# Try to import the database service for caller history lookups
+try:
+    from services.database_service import get_db_service
+except ImportError:
+    get_db_service = None
+
 
 class IVRController:
     """
@@ -62,6 +75,7 @@ class IVRController:
     def __init__(self):
         """Initialize the IVR Controller"""
         self.vmc_service = get_vmc_service() if get_vmc_service else None
+        self.db_service = get_db_service() if get_db_service else None
         
         # Multi-language keyword patterns for complaint detection
         self.category_keywords = {
@@ -83,47 +97,26 @@ class IVRController:
             }
         }
         
-        # Sub-category questions per category
-        self.sub_category_questions = {
-            "Street Light": {
-                "en": "Is the light not working, flickering, or is the pole damaged?",
-                "hi": "Kya light band hai, jhilmila rahi hai, ya pole tuta hua hai?"
-            },
-            "Water Supply": {
-                "en": "Is there no water supply, low pressure, or pipe leakage?",
-                "hi": "Kya pani nahi aa raha, kam pressure hai, ya pipe leak hai?"
-            },
-            "Garbage": {
-                "en": "Is garbage not collected, dustbin overflowing, or bad smell issue?",
-                "hi": "Kya kachra nahi uthaya gaya, dustbin bhar gaya, ya badbu ki samasya hai?"
-            },
-            "Road Damage": {
-                "en": "Is there a pothole, road crack, or waterlogging on the road?",
-                "hi": "Kya sadak mein gadda hai, daraar hai, ya pani jamaa hai?"
-            },
-            "Other": {
-                "en": "Please briefly describe your issue.",
-                "hi": "Kripya apni samasya ka varnan karein."
-            }
-        }
+        # Conversation flow: states, transitions and prompts come from the
+        # definition file, validated and compiled once here
+        self.flow = load_flow(self._flow_actions())
+        
+        # Where spilled conversation history chunks are kept
+        self.history_store = get_db_service() if get_db_service else None
     
     def create_session(self) -> Dict:
         """Create a new IVR session with empty state"""
         return {
-            "session_id": datetime.now().strftime("%Y%m%d%H%M%S"),
-            "state": self.STATE_GREETING,
+            "session_id": generate_session_id(),
+            "state": self.flow.initial_state,
             "language": "en",
-            "collected_data": {
-                "category": None,
-                "sub_category": None,
-                "description": None,
-                "location": None,
-                "landmark": None,
-                "phone": None,
-                "ward": None,
-                "zone": None
-            },
+            "collected_data": self._empty_collected_data(),
+            # Bounded list of (role, offset_ms, text); older turns are
+            # compressed into chunks stored under the session ID
             "conversation_history": [],
+            "history_chunks": 0,
+            "history_spilled": 0,
+            "started_ms": now_ms(),
             "created_at": datetime.now().isoformat()
         }
     
@@ -143,52 +136,12 @@ class IVRController:
         session["language"] = language
         
         # Add to conversation history
-        session["conversation_history"].append({
-            "role": "user",
-            "text": user_input,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        # Process based on current state
-        current_state = session["state"]
+        record_turn(session, ROLE_USER, user_input, store=self.history_store)
         
-        if current_state == self.STATE_GREETING:
-            return self._handle_greeting(user_input, session)
-        
-        elif current_state == self.STATE_ASK_ISSUE:
-            return self._handle_issue_detection(user_input, session)
-        
-        elif current_state == self.STATE_ASK_SUB_CATEGORY:
-            return self._handle_sub_category(user_input, session)
-        
-        elif current_state == self.STATE_ASK_LOCATION:
-            return self._handle_location(user_input, session)
-        
-        elif current_state == self.STATE_ASK_LANDMARK:
-            return self._handle_landmark(user_input, session)
-        
-        elif current_state == self.STATE_ASK_PHONE:
-            return self._handle_phone(user_input, session)
-        
-        elif current_state == self.STATE_CONFIRM:
-            return self._handle_confirmation(user_input, session)
-        
-        elif current_state == self.STATE_COMPLETE:
-            return self._generate_response(
-                session,
-                "Your complaint is already registered.",
-                "Aapki shikayat pehle se darj hai.",
-                self.STATE_COMPLETE,
-                is_complete=True
-            )
-        
-        # Default: Ask for the issue
-        return self._generate_response(
-            session,
-            "Please describe your complaint.",
-            "Kripya apni shikayat batayein.",
-            self.STATE_ASK_ISSUE
-        )
+        # One table lookup for the state and one for the action's outcome,
+        # however many states the flow defines
+        transition, context = self.flow.step(user_input, session)
+        return self._generate_response(session, transition, context)
     
     def _detect_language(self, text: str) -> str:
         """Detect if input is in Hindi or English"""
@@ -275,235 +228,161 @@ class IVRController:
         
         return location
     
-    def _handle_greeting(self, user_input: str, session: Dict) -> Dict:
-        """Handle initial greeting state"""
-        # Try to detect if user directly mentioned their issue
+    def _flow_actions(self) -> Dict[str, FlowAction]:
+        """Actions the flow definition can attach to its states"""
+        return {
+            "detect_category": FlowAction(
+                self._detect_issue, ("detected", "undetected"), ("category",)
+            ),
+            "detect_category_or_other": FlowAction(
+                self._detect_issue_or_other, ("detected", "other"), ("category",)
+            ),
+            "store_input": FlowAction(self._store_input, ("stored",), params=("field",)),
+            "capture_location": FlowAction(self._capture_location, ("ward_or_zone", "area_only")),
+            "capture_phone": FlowAction(
+                self._capture_phone,
+                ("valid", "invalid"),
+                ("category", "location", "phone", "existing", "existing_type", "existing_id")
+            ),
+            "confirm": FlowAction(self._confirm, ("yes", "no", "unclear"), ("complaint_id",)),
+            "none": FlowAction(self._no_action, ("done",))
+        }
+    
+    @staticmethod
+    def _empty_collected_data() -> Dict:
+        """Collected complaint fields before the caller has said anything"""
+        return {
+            "category": None,
+            "sub_category": None,
+            "description": None,
+            "location": None,
+            "landmark": None,
+            "phone": None,
+            "ward": None,
+            "zone": None
+        }
+    
+    def _detect_issue(self, user_input: str, session: Dict) -> ActionResult:
+        """Pick up a complaint category from the caller's description"""
         category = self._detect_category(user_input)
         
-        if category:
-            session["collected_data"]["category"] = category
-            session["collected_data"]["description"] = user_input
-            
-            # Move to sub-category question
-            question = self.sub_category_questions.get(category, self.sub_category_questions["Other"])
-            return self._generate_response(
-                session,
-                question["en"],
-                question["hi"],
-                self.STATE_ASK_SUB_CATEGORY
-            )
+        if not category:
+            return "undetected", {}
         
-        # No category detected, ask for issue
-        return self._generate_response(
-            session,
-            "Namaste. Welcome to Municipal Complaint Helpline. Please describe your complaint.",
-            "Namaste. Nagar Nigam Shikayat Helpline mein aapka swagat hai. Kripya apni shikayat batayein.",
-            self.STATE_ASK_ISSUE
-        )
+        session["collected_data"]["category"] = category
+        session["collected_data"]["description"] = user_input
+        return "detected", {"category": category}
     
-    def _handle_issue_detection(self, user_input: str, session: Dict) -> Dict:
-        """Handle issue description and detect category"""
-        category = self._detect_category(user_input)
-        
-        if category:
-            session["collected_data"]["category"] = category
-            session["collected_data"]["description"] = user_input
-            
-            # Ask sub-category question
-            question = self.sub_category_questions.get(category, self.sub_category_questions["Other"])
-            return self._generate_response(
-                session,
-                question["en"],
-                question["hi"],
-                self.STATE_ASK_SUB_CATEGORY
-            )
+    def _detect_issue_or_other(self, user_input: str, session: Dict) -> ActionResult:
+        """Like _detect_issue, but file undetected issues under "Other" """
+        outcome, context = self._detect_issue(user_input, session)
+        if outcome == "detected":
+            return outcome, context
         
         # Could not detect category, assign to "Other"
         session["collected_data"]["category"] = "Other"
         session["collected_data"]["description"] = user_input
-        
-        # Ask for location directly
-        return self._generate_response(
-            session,
-            "Your issue has been noted. Please provide the location address.",
-            "Aapki samasya note ki gayi. Kripya pata batayein jahaan samasya hai.",
-            self.STATE_ASK_LOCATION
-        )
+        return "other", {"category": "Other"}
     
-    def _handle_sub_category(self, user_input: str, session: Dict) -> Dict:
-        """Handle sub-category response"""
-        session["collected_data"]["sub_category"] = user_input
-        
-        # Ask for location
-        return self._generate_response(
-            session,
-            "Where is this issue located? Please provide the area name and address.",
-            "Yeh samasya kahan hai? Kripya area ka naam aur pata batayein.",
-            self.STATE_ASK_LOCATION
-        )
+    def _store_input(self, user_input: str, session: Dict, field: str) -> ActionResult:
+        """Keep the caller's answer as one collected field"""
+        session["collected_data"][field] = user_input
+        return "stored", {}
     
-    def _handle_location(self, user_input: str, session: Dict) -> Dict:
+    def _capture_location(self, user_input: str, session: Dict) -> ActionResult:
         """Handle location input"""
         location_info = self._extract_location_info(user_input)
         session["collected_data"]["location"] = location_info["area"]
         session["collected_data"]["ward"] = location_info.get("ward")
         session["collected_data"]["zone"] = location_info.get("zone")
         
-        # If ward/zone detected, skip landmark, ask for phone
+        # If ward/zone detected, the landmark question is skipped
         if location_info.get("ward") or location_info.get("zone"):
-            return self._generate_response(
-                session,
-                "Please provide your mobile number for follow-up.",
-                "Kripya apna mobile number batayein follow-up ke liye.",
-                self.STATE_ASK_PHONE
-            )
-        
-        # Ask for landmark for better location
-        return self._generate_response(
-            session,
-            "Any nearby landmark? This helps us locate the issue faster.",
-            "Koi najdeeki landmark? Isse hum jaldi madad kar sakte hain.",
-            self.STATE_ASK_LANDMARK
-        )
-    
-    def _handle_landmark(self, user_input: str, session: Dict) -> Dict:
-        """Handle landmark input"""
-        session["collected_data"]["landmark"] = user_input
-        
-        # Ask for phone number
-        return self._generate_response(
-            session,
-            "Please provide your mobile number for follow-up.",
-            "Kripya apna mobile number batayein follow-up ke liye.",
-            self.STATE_ASK_PHONE
-        )
+            return "ward_or_zone", {}
+        return "area_only", {}
     
-    def _handle_phone(self, user_input: str, session: Dict) -> Dict:
-        """Handle phone number input"""
+    def _capture_phone(self, user_input: str, session: Dict) -> ActionResult:
+        """Handle phone number input and gather the confirmation details"""
         phone = self._extract_phone(user_input)
         
-        if phone:
-            session["collected_data"]["phone"] = phone
-            
-            # Generate confirmation message
-            data = session["collected_data"]
-            location_str = data.get("location", "")
-            if data.get("landmark"):
-                location_str += f", near {data['landmark']}"
-            
-            confirm_en = (f"Confirm: {data['category']} complaint at {location_str}. "
-                         f"Contact: {phone}. Say 'yes' to confirm or 'no' to cancel.")
-            confirm_hi = (f"Prishti karein: {data['category']} shikayat {location_str} par. "
-                         f"Sampark: {phone}. 'Haan' bolein confirm ke liye, 'Na' cancel ke liye.")
-            
-            return self._generate_response(
-                session,
-                confirm_en,
-                confirm_hi,
-                self.STATE_CONFIRM
+        if not phone:
+            return "invalid", {}
+        
+        session["collected_data"]["phone"] = phone
+        data = session["collected_data"]
+        location_str = data.get("location", "")
+        if data.get("landmark"):
+            location_str += f", near {data['landmark']}"
+        
+        context = {
+            "category": data["category"],
+            "location": location_str,
+            "phone": phone,
+            "existing": "none"
+        }
+        
+        # Tell the caller about a complaint they already have open
+        existing = self._find_open_complaint(phone)
+        session["existing_complaint_id"] = existing.complaint_id if existing else None
+        if existing:
+            context.update(
+                existing="open",
+                existing_type=existing.complaint_type,
+                existing_id=existing.complaint_id
             )
         
-        # Invalid phone, ask again
-        return self._generate_response(
-            session,
-            "Please provide a valid 10-digit mobile number.",
-            "Kripya 10 ank ka sahi mobile number batayein.",
-            self.STATE_ASK_PHONE
-        )
+        return "valid", context
+    
+    def _find_open_complaint(self, phone: str):
+        """Caller's most recent pending or in-progress complaint, if any"""
+        if not self.db_service:
+            return None
+        try:
+            open_complaints = self.db_service.get_complaints_by_phone(phone, open_only=True, limit=1)
+            return open_complaints[0] if open_complaints else None
+        except Exception as e:
+            print(f"Caller history lookup error: {e}")
+            return None
     
-    def _handle_confirmation(self, user_input: str, session: Dict) -> Dict:
+    # Words that confirm or cancel a complaint
+    AFFIRMATIVE_WORDS = ("yes", "haan", "ha", "ji", "correct", "sahi", "theek", "confirm", "ok", "okay")
+    NEGATIVE_WORDS = ("no", "nahi", "na", "galat", "cancel", "wrong")
+    
+    def _confirm(self, user_input: str, session: Dict) -> ActionResult:
         """Handle yes/no confirmation"""
         text_lower = user_input.lower()
         
-        # Check for affirmative response
-        affirmative = ["yes", "haan", "ha", "ji", "correct", "sahi", "theek", "confirm", "ok", "okay"]
-        negative = ["no", "nahi", "na", "galat", "cancel", "wrong"]
-        
-        if any(word in text_lower for word in affirmative):
-            # Generate complaint ID
+        if any(word in text_lower for word in self.AFFIRMATIVE_WORDS):
             complaint_id = self._generate_complaint_id(session)
             session["collected_data"]["complaint_id"] = complaint_id
-            session["state"] = self.STATE_COMPLETE
-            
-            success_en = (f"Your complaint has been registered. "
-                         f"Complaint ID: {complaint_id}. "
-                         f"Please save this ID to track status. Thank you.")
-            success_hi = (f"Aapki shikayat darj ho gayi hai. "
-                         f"Shikayat ID: {complaint_id}. "
-                         f"Kripya yeh ID surakshit rakhein status ke liye. Dhanyavaad.")
-            
-            return self._generate_response(
-                session,
-                success_en,
-                success_hi,
-                self.STATE_COMPLETE,
-                is_complete=True,
-                complaint_id=complaint_id
-            )
+            return "yes", {"complaint_id": complaint_id}
         
-        if any(word in text_lower for word in negative):
-            # Reset to ask issue again
-            session["collected_data"] = {
-                "category": None,
-                "sub_category": None,
-                "description": None,
-                "location": None,
-                "landmark": None,
-                "phone": None,
-                "ward": None,
-                "zone": None
-            }
-            
-            return self._generate_response(
-                session,
-                "Cancelled. Please describe your complaint again.",
-                "Radd kiya gaya. Kripya dubara apni shikayat batayein.",
-                self.STATE_ASK_ISSUE
-            )
+        if any(word in text_lower for word in self.NEGATIVE_WORDS):
+            # Start over from the issue description
+            session["collected_data"] = self._empty_collected_data()
+            return "no", {}
         
-        # Unclear response
-        return self._generate_response(
-            session,
-            "Please say 'yes' to confirm or 'no' to cancel.",
-            "Kripya 'haan' bolein confirm ke liye ya 'na' cancel ke liye.",
-            self.STATE_CONFIRM
-        )
+        return "unclear", {}
+    
+    def _no_action(self, user_input: str, session: Dict) -> ActionResult:
+        """States that answer the same way whatever the caller says"""
+        return "done", {}
     
     def _generate_complaint_id(self, session: Dict) -> str:
         """Generate a unique complaint ID"""
-        category = session["collected_data"].get("category", "OTH")
-        category_codes = {
-            "Street Light": "SL",
-            "Water Supply": "WS",
-            "Garbage": "GB",
-            "Road Damage": "RD",
-            "Other": "OT"
-        }
-        code = category_codes.get(category, "OT")
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"VMC-{code}-{timestamp}"
+        data = session["collected_data"]
+        return generate_complaint_id(data.get("category") or "Other", data.get("ward") or "")
     
-    def _generate_response(
-        self,
-        session: Dict,
-        message_en: str,
-        message_hi: str,
-        next_state: str,
-        is_complete: bool = False,
-        complaint_id: str = None
-    ) -> Dict:
+    def _generate_response(self, session: Dict, transition: Transition, context: Dict) -> Dict:
         """Generate JSON response for IVR"""
         language = session.get("language", "en")
-        message = message_hi if language == "hi" else message_en
+        message = transition.prompt.render(language, context)
+        next_state = transition.next_state
         
         session["state"] = next_state
         
         # Add to conversation history
-        session["conversation_history"].append({
-            "role": "assistant",
-            "text": message,
-            "timestamp": datetime.now().isoformat()
-        })
+        record_turn(session, ROLE_ASSISTANT, message, store=self.history_store)
         
         response = {
             "success": True,
@@ -511,29 +390,16 @@ class IVRController:
             "state": next_state,
             "language": language,
             "message": message,
-            "is_complete": is_complete,
+            "is_complete": transition.is_complete,
             "collected_data": session["collected_data"],
-            "next_expected_input": self._get_expected_input(next_state)
+            "next_expected_input": transition.expected_input
         }
         
+        complaint_id = context.get("complaint_id")
         if complaint_id:
             response["complaint_id"] = complaint_id
         
         return response
-    
-    def _get_expected_input(self, state: str) -> str:
-        """Get description of expected input for the state"""
-        expected = {
-            self.STATE_GREETING: "greeting or complaint description",
-            self.STATE_ASK_ISSUE: "complaint description",
-            self.STATE_ASK_SUB_CATEGORY: "specific issue details",
-            self.STATE_ASK_LOCATION: "location/address",
-            self.STATE_ASK_LANDMARK: "nearby landmark",
-            self.STATE_ASK_PHONE: "10-digit mobile number",
-            self.STATE_CONFIRM: "yes/no confirmation",
-            self.STATE_COMPLETE: "none - complaint registered"
-        }
-        return expected.get(state, "text input")
 
 
 # Singleton instance
@@ -0,0 +1,350 @@
+"""
+AI Smart Call Center - IVR Flow Engine
+Loads the IVR conversation flow from a declarative definition, validates it
+and compiles it into a transition table with constant-time dispatch
+"""
+
+import json
+import os
+import string
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_FLOW_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flows", "complaint_flow.json"
+)
+FLOW_FILE = os.getenv("IVR_FLOW_FILE", DEFAULT_FLOW_FILE)
+
+# What an action returns: the outcome name and the values its prompt can use
+ActionResult = Tuple[str, Dict]
+
+# Expected-input hint for states that do not declare one
+DEFAULT_EXPECTED_INPUT = "text input"
+
+
+class FlowDefinitionError(ValueError):
+    """Raised when a flow definition fails validation"""
+
+
+class FlowAction(NamedTuple):
+    """
+    Something a flow state can do with the caller's input
+
+    handler(user_input, session, **params) updates the session and returns
+    (outcome, context). The definition must map every outcome to a
+    transition, and its prompts may only use the context fields listed.
+    """
+    handler: Callable[..., ActionResult]
+    outcomes: Tuple[str, ...]
+    fields: Tuple[str, ...] = ()
+    params: Tuple[str, ...] = ()
+
+
+class Prompt:
+    """
+    One prompt with every language (and variant) prepared up front
+
+    Each text is stored with a flag saying whether it has placeholders, so
+    rendering a static prompt is two dict lookups and no formatting.
+    """
+
+    __slots__ = ('key', 'variants_by', 'variants', 'default', 'fields')
+
+    def __init__(self, key: str, variants_by: Optional[str],
+                 variants: Dict[str, Dict[str, Tuple[str, bool]]], default: str, fields: frozenset):
+        self.key = key
+        self.variants_by = variants_by
+        self.variants = variants
+        self.default = variants[default]
+        self.fields = fields
+
+    def render(self, language: str, context: Dict) -> str:
+        if self.variants_by is None:
+            texts = self.default
+        else:
+            texts = self.variants.get(context.get(self.variants_by), self.default)
+        text, templated = texts.get(language) or texts[None]
+        return text.format_map(context) if templated else text
+
+
+class Transition(NamedTuple):
+    """Where an outcome leads and what the caller hears on the way"""
+    next_state: str
+    prompt: Prompt
+    is_complete: bool
+    expected_input: str
+
+
+class FlowState:
+    """A compiled state: its bound action and outcome -> transition table"""
+
+    __slots__ = ('name', 'handler', 'transitions', 'expected_input')
+
+    def __init__(self, name: str, handler: Callable[..., ActionResult],
+                 transitions: Dict[str, Transition], expected_input: str):
+        self.name = name
+        self.handler = handler
+        self.transitions = transitions
+        self.expected_input = expected_input
+
+
+class CompiledFlow:
+    """
+    A validated flow ready to run
+
+    step() is one dict lookup for the state, the state's action, and one
+    dict lookup for the transition, however many states the flow has.
+    """
+
+    def __init__(self, name: str, initial_state: str, states: Dict[str, FlowState],
+                 fallback: Transition, source: str):
+        self.name = name
+        self.initial_state = initial_state
+        self.states = states
+        self.fallback = fallback
+        self.source = source
+
+    def step(self, user_input: str, session: Dict) -> Tuple[Transition, Dict]:
+        """Run the current state's action; unknown states take the fallback"""
+        state = self.states.get(session["state"])
+        if state is None:
+            return self.fallback, {}
+        outcome, context = state.handler(user_input, session)
+        return state.transitions[outcome], context
+
+    def expected_input(self, state: str) -> str:
+        """Description of the input a state waits for"""
+        compiled = self.states.get(state)
+        return compiled.expected_input if compiled else DEFAULT_EXPECTED_INPUT
+
+    def get_summary(self) -> Dict:
+        """Size of the compiled flow"""
+        return {
+            'name': self.name,
+            'source': self.source,
+            'states': len(self.states),
+            'transitions': sum(len(s.transitions) for s in self.states.values()),
+            'initial_state': self.initial_state
+        }
+
+
+def _template_fields(text: str) -> frozenset:
+    """Placeholder names used by a str.format template"""
+    return frozenset(name for _, name, _, _ in string.Formatter().parse(text) if name is not None)
+
+
+def _compile_prompts(definition: Dict, languages: List[str], default_language: str,
+                     errors: List[str]) -> Dict[str, Prompt]:
+    """Check and prepare every prompt in the definition"""
+    compiled = {}
+    for key, spec in (definition.get("prompts") or {}).items():
+        if not isinstance(spec, dict):
+            errors.append(f"prompt '{key}' must be an object")
+            continue
+        variants_by = spec.get("variants_by")
+        if variants_by is None:
+            raw_variants, default = {None: spec}, None
+        else:
+            raw_variants, default = spec.get("variants") or {}, spec.get("default")
+            if default not in raw_variants:
+                errors.append(f"prompt '{key}' default variant '{default}' is not defined")
+                continue
+
+        variants, fields, valid = {}, set(), True
+        for variant, texts in raw_variants.items():
+            where = f"prompt '{key}'" + (f" variant '{variant}'" if variant is not None else "")
+            prepared = {}
+            for language in languages:
+                text = texts.get(language) if isinstance(texts, dict) else None
+                if not isinstance(text, str) or not text:
+                    errors.append(f"{where} has no '{language}' text")
+                    valid = False
+                    continue
+                try:
+                    names = _template_fields(text)
+                except ValueError as e:
+                    errors.append(f"{where} '{language}' text is not a valid template: {e}")
+                    valid = False
+                    continue
+                fields |= names
+                prepared[language] = (text, bool(names))
+            if valid:
+                # Unknown languages fall back to the default one
+                prepared[None] = prepared[default_language]
+            variants[variant] = prepared
+
+        if valid:
+            compiled[key] = Prompt(key, variants_by, variants, default, frozenset(fields))
+    return compiled
+
+
+def _compile_transition(where: str, spec: Dict, prompts: Dict[str, Prompt], provided: frozenset,
+                        state_names, errors: List[str]) -> Optional[Tuple[str, Prompt, bool]]:
+    """Check one transition against the states, prompts and action fields"""
+    if not isinstance(spec, dict):
+        errors.append(f"{where} must be an object")
+        return None
+    next_state, prompt_key = spec.get("next"), spec.get("prompt")
+    ok = True
+    if next_state not in state_names:
+        errors.append(f"{where} leads to unknown state '{next_state}'")
+        ok = False
+    prompt = prompts.get(prompt_key)
+    if prompt is None:
+        errors.append(f"{where} uses unknown or invalid prompt '{prompt_key}'")
+        return None
+    if prompt.variants_by is not None and prompt.variants_by not in provided:
+        errors.append(f"{where} prompt '{prompt_key}' picks variants by '{prompt.variants_by}', "
+                      f"which the action does not provide")
+        ok = False
+    missing = prompt.fields - provided
+    if missing:
+        errors.append(f"{where} prompt '{prompt_key}' uses {sorted(missing)}, "
+                      f"which the action does not provide")
+        ok = False
+    return (next_state, prompt, bool(spec.get("complete", False))) if ok else None
+
+
+def _reachable(initial: str, definition_states: Dict, fallback_next: Optional[str]) -> set:
+    """States reachable from the initial state (and the fallback)"""
+    seen = set()
+    pending = [s for s in (initial, fallback_next) if s in definition_states]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        transitions = definition_states[name].get("transitions") or {}
+        for spec in transitions.values():
+            target = spec.get("next") if isinstance(spec, dict) else None
+            if target in definition_states and target not in seen:
+                pending.append(target)
+    return seen
+
+
+def compile_flow(definition: Dict, actions: Dict[str, FlowAction], source: str = "<flow>") -> CompiledFlow:
+    """
+    Validate a flow definition and compile it into a transition table
+
+    Every problem found is reported at once, so a broken definition fails
+    the service at startup instead of in the middle of a call.
+
+    Args:
+        definition: Parsed flow definition (see flows/complaint_flow.json)
+        actions: Action name -> FlowAction available to states
+        source: Where the definition came from, for error messages
+
+    Raises:
+        FlowDefinitionError: If the definition does not validate
+    """
+    errors: List[str] = []
+    languages = definition.get("languages") or ["en"]
+    default_language = definition.get("default_language", languages[0])
+    if default_language not in languages:
+        errors.append(f"default_language '{default_language}' is not in languages")
+        default_language = languages[0]
+
+    definition_states = definition.get("states") or {}
+    if not isinstance(definition_states, dict) or not definition_states:
+        raise FlowDefinitionError(f"Invalid IVR flow {source}: no states defined")
+    initial_state = definition.get("initial_state")
+    if initial_state not in definition_states:
+        errors.append(f"initial_state '{initial_state}' is not a defined state")
+
+    prompts = _compile_prompts(definition, languages, default_language, errors)
+
+    # Expected-input hints are copied onto transitions once all states are known
+    raw_states = {}
+    for name, spec in definition_states.items():
+        where = f"state '{name}'"
+        action = actions.get(spec.get("action"))
+        if action is None:
+            errors.append(f"{where} uses unknown action '{spec.get('action')}'")
+            continue
+
+        params = spec.get("params") or {}
+        missing_params = set(action.params) - set(params)
+        unknown_params = set(params) - set(action.params)
+        if missing_params:
+            errors.append(f"{where} is missing params {sorted(missing_params)}")
+        if unknown_params:
+            errors.append(f"{where} has unknown params {sorted(unknown_params)}")
+
+        transitions_spec = spec.get("transitions") or {}
+        missing_outcomes = set(action.outcomes) - set(transitions_spec)
+        unknown_outcomes = set(transitions_spec) - set(action.outcomes)
+        if missing_outcomes:
+            errors.append(f"{where} has no transition for outcomes {sorted(missing_outcomes)}")
+        if unknown_outcomes:
+            errors.append(f"{where} has transitions for unknown outcomes {sorted(unknown_outcomes)}")
+
+        provided = frozenset(action.fields)
+        transitions = {}
+        for outcome in action.outcomes:
+            if outcome in transitions_spec:
+                compiled = _compile_transition(f"{where} outcome '{outcome}'", transitions_spec[outcome],
+                                               prompts, provided, definition_states, errors)
+                if compiled:
+                    transitions[outcome] = compiled
+
+        handler = partial(action.handler, **params) if params else action.handler
+        raw_states[name] = (handler, transitions, spec.get("expected_input", DEFAULT_EXPECTED_INPUT))
+
+    fallback_spec = definition.get("fallback")
+    fallback = None
+    if fallback_spec is None:
+        errors.append("no fallback transition defined")
+    else:
+        fallback = _compile_transition("fallback", fallback_spec, prompts, frozenset(),
+                                       definition_states, errors)
+
+    reachable = _reachable(initial_state, definition_states,
+                           fallback_spec.get("next") if isinstance(fallback_spec, dict) else None)
+    for name in definition_states:
+        if name not in reachable:
+            errors.append(f"state '{name}' is unreachable")
+
+    if errors:
+        raise FlowDefinitionError(
+            f"Invalid IVR flow {source}:\n" + "\n".join(f"  - {error}" for error in errors)
+        )
+
+    def expected(state_name: str) -> str:
+        return raw_states[state_name][2]
+
+    states = {
+        name: FlowState(
+            name,
+            handler,
+            {
+                outcome: Transition(next_state, prompt, is_complete, expected(next_state))
+                for outcome, (next_state, prompt, is_complete) in transitions.items()
+            },
+            expected_input
+        )
+        for name, (handler, transitions, expected_input) in raw_states.items()
+    }
+    next_state, prompt, is_complete = fallback
+    return CompiledFlow(
+        definition.get("name", "flow"),
+        initial_state,
+        states,
+        Transition(next_state, prompt, is_complete, expected(next_state)),
+        source
+    )
+
+
+def load_flow(actions: Dict[str, FlowAction], path: str = None) -> CompiledFlow:
+    """
+    Read, validate and compile a flow definition file
+
+    Raises:
+        FlowDefinitionError: If the file is missing, not JSON, or invalid
+    """
+    path = path or FLOW_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            definition = json.load(f)
+    except (OSError, ValueError) as e:
+        raise FlowDefinitionError(f"Cannot load IVR flow {path}: {e}") from e
+    return compile_flow(definition, actions, source=path)
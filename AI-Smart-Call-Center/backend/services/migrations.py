@@ -0,0 +1,457 @@
+"""
+AI Smart Call Center - Schema Migrations
+Versioned, ordered schema changes applied at startup
+"""
+
+import sqlite3
+import unicodedata
+from datetime import datetime
+from typing import Callable, List, Tuple, Union
+
+from utils.phone import normalize_phone
+
+
+# A migration step is either a SQL statement or a callable taking the connection
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+# unicode61 treats combining marks as separators, which splits Hindi and
+# Gujarati words at every vowel sign (पानी -> प, न). Declaring the Devanagari
+# and Gujarati marks as token characters keeps whole words together.
+INDIC_TOKENCHARS = ''.join(
+    chr(code) for code in list(range(0x0900, 0x0980)) + list(range(0x0A80, 0x0B00))
+    if unicodedata.category(chr(code)) in ('Mn', 'Mc')
+)
+
+
+def _create_complaints_fts(conn: sqlite3.Connection):
+    """Create the complaints_fts index, its sync triggers, and backfill it"""
+    tokenizer = f"unicode61 remove_diacritics 2 tokenchars '{INDIC_TOKENCHARS}'"
+    try:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts USING fts5(
+                complaint_id, complaint_type, area, description, phone_number,
+                content='complaints', content_rowid='rowid',
+                tokenize="{tokenizer}"
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: search falls back to LIKE scans
+        print(f"Full-text search unavailable: {e}")
+        return
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_insert AFTER INSERT ON complaints BEGIN
+            INSERT INTO complaints_fts (rowid, complaint_id, complaint_type, area, description, phone_number)
+            VALUES (new.rowid, new.complaint_id, new.complaint_type, new.area, new.description, new.phone_number);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_delete AFTER DELETE ON complaints BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, complaint_id, complaint_type, area, description, phone_number)
+            VALUES ('delete', old.rowid, old.complaint_id, old.complaint_type, old.area, old.description, old.phone_number);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_fts_update
+        AFTER UPDATE OF complaint_id, complaint_type, area, description, phone_number ON complaints BEGIN
+            INSERT INTO complaints_fts (complaints_fts, rowid, complaint_id, complaint_type, area, description, phone_number)
+            VALUES ('delete', old.rowid, old.complaint_id, old.complaint_type, old.area, old.description, old.phone_number);
+            INSERT INTO complaints_fts (rowid, complaint_id, complaint_type, area, description, phone_number)
+            VALUES (new.rowid, new.complaint_id, new.complaint_type, new.area, new.description, new.phone_number);
+        END
+    ''')
+    conn.execute("INSERT INTO complaints_fts (complaints_fts) VALUES ('rebuild')")
+
+
+# complaints column feeding each complaint_counters dimension
+COUNTER_DIMENSIONS = (
+    ('status', 'status'),
+    ('type', 'complaint_type'),
+    ('zone', 'zone'),
+    ('ward', 'ward'),
+)
+
+
+def _counter_values(row_alias: str, delta: int) -> str:
+    """VALUES list adding delta to every counter bucket of one row"""
+    values = [f"('total', '', {delta})"]
+    for dimension, column in COUNTER_DIMENSIONS:
+        values.append(f"('{dimension}', COALESCE({row_alias}.{column}, ''), {delta})")
+    return ', '.join(values)
+
+
+def _create_complaint_counters(conn: sqlite3.Connection):
+    """Create complaint_counters, the triggers maintaining it, and backfill it"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_counters (
+            dimension TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, bucket)
+        ) WITHOUT ROWID
+    ''')
+    
+    upsert = ('INSERT INTO complaint_counters (dimension, bucket, count) VALUES {values} '
+              'ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count;')
+    tracked_columns = ', '.join(column for _, column in COUNTER_DIMENSIONS)
+    
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_insert AFTER INSERT ON complaints BEGIN
+            {upsert.format(values=_counter_values('new', 1))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_delete AFTER DELETE ON complaints BEGIN
+            {upsert.format(values=_counter_values('old', -1))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_update
+        AFTER UPDATE OF {tracked_columns} ON complaints BEGIN
+            {upsert.format(values=_counter_values('old', -1))}
+            {upsert.format(values=_counter_values('new', 1))}
+        END
+    ''')
+    
+    conn.execute('DELETE FROM complaint_counters')
+    conn.execute("INSERT INTO complaint_counters SELECT 'total', '', COUNT(*) FROM complaints")
+    for dimension, column in COUNTER_DIMENSIONS:
+        conn.execute(
+            f"INSERT INTO complaint_counters SELECT '{dimension}', COALESCE({column}, ''), COUNT(*) "
+            f"FROM complaints GROUP BY COALESCE({column}, '')"
+        )
+
+
+def _create_type_status_counters(conn: sqlite3.Connection):
+    """Add complaint_counters buckets per (complaint_type, status) pair and backfill them"""
+    # Bucket is '<complaint_type>|<status>'; kept in their own triggers so the
+    # version 3 triggers stay as they were applied
+    bucket = "COALESCE({alias}.complaint_type, '') || '|' || COALESCE({alias}.status, '')"
+    upsert = ("INSERT INTO complaint_counters (dimension, bucket, count) VALUES ('type_status', {bucket}, {delta}) "
+              "ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count;")
+    
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_type_status_insert AFTER INSERT ON complaints BEGIN
+            {upsert.format(bucket=bucket.format(alias='new'), delta=1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_type_status_delete AFTER DELETE ON complaints BEGIN
+            {upsert.format(bucket=bucket.format(alias='old'), delta=-1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_type_status_update
+        AFTER UPDATE OF complaint_type, status ON complaints BEGIN
+            {upsert.format(bucket=bucket.format(alias='old'), delta=-1)}
+            {upsert.format(bucket=bucket.format(alias='new'), delta=1)}
+        END
+    ''')
+    
+    conn.execute("DELETE FROM complaint_counters WHERE dimension = 'type_status'")
+    conn.execute(
+        f"INSERT INTO complaint_counters SELECT 'type_status', {bucket.format(alias='complaints')}, "
+        f"COUNT(*) FROM complaints GROUP BY 2"
+    )
+
+
+def _version_complaint_counters(conn: sqlite3.Connection):
+    """Stamp every complaint_counters change with a global version for delta reads"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_counters_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO complaint_counters_version (id, version) VALUES (1, 0)')
+    conn.execute('ALTER TABLE complaint_counters ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+    
+    # Each new or changed bucket takes the next version; the inner UPDATE only
+    # sets version, so it does not fire the UPDATE OF count trigger again
+    stamp = '''
+            UPDATE complaint_counters_version SET version = version + 1 WHERE id = 1;
+            UPDATE complaint_counters
+            SET version = (SELECT version FROM complaint_counters_version WHERE id = 1)
+            WHERE dimension = new.dimension AND bucket = new.bucket;
+    '''
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_version_insert
+        AFTER INSERT ON complaint_counters BEGIN
+            {stamp}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_counters_version_update
+        AFTER UPDATE OF count ON complaint_counters BEGIN
+            {stamp}
+        END
+    ''')
+
+
+# complaints column feeding each complaint_rollups dimension
+ROLLUP_DIMENSIONS = ('complaint_type', 'sub_category', 'ward', 'zone', 'status')
+
+# Bucket key expressions over an ISO-8601 created_at
+ROLLUP_GRANULARITIES = (
+    ('hour', "substr({alias}.created_at, 1, 13) || ':00:00'"),
+    ('day', "substr({alias}.created_at, 1, 10)"),
+)
+
+
+def _rollup_values(row_alias: str, delta: int) -> str:
+    """VALUES list adding delta to every hourly and daily bucket of one row"""
+    values = []
+    for granularity, bucket_expr in ROLLUP_GRANULARITIES:
+        bucket = bucket_expr.format(alias=row_alias)
+        values.append(f"('{granularity}', {bucket}, 'all', '', {delta})")
+        for column in ROLLUP_DIMENSIONS:
+            values.append(
+                f"('{granularity}', {bucket}, '{column}', COALESCE({row_alias}.{column}, ''), {delta})"
+            )
+    return ', '.join(values)
+
+
+def _create_complaint_rollups(conn: sqlite3.Connection):
+    """Create complaint_rollups, the triggers maintaining it, and backfill it"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_rollups (
+            granularity TEXT NOT NULL,
+            bucket_start TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, dimension, bucket_start, value)
+        ) WITHOUT ROWID
+    ''')
+    
+    upsert = ('INSERT INTO complaint_rollups (granularity, bucket_start, dimension, value, count) '
+              'VALUES {values} ON CONFLICT (granularity, dimension, bucket_start, value) '
+              'DO UPDATE SET count = count + excluded.count;')
+    tracked_columns = ', '.join(('created_at',) + ROLLUP_DIMENSIONS)
+    
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_rollups_insert AFTER INSERT ON complaints
+        WHEN new.created_at IS NOT NULL BEGIN
+            {upsert.format(values=_rollup_values('new', 1))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_rollups_delete AFTER DELETE ON complaints
+        WHEN old.created_at IS NOT NULL BEGIN
+            {upsert.format(values=_rollup_values('old', -1))}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaint_rollups_update
+        AFTER UPDATE OF {tracked_columns} ON complaints
+        WHEN old.created_at IS NOT NULL AND new.created_at IS NOT NULL BEGIN
+            {upsert.format(values=_rollup_values('old', -1))}
+            {upsert.format(values=_rollup_values('new', 1))}
+        END
+    ''')
+    
+    conn.execute('DELETE FROM complaint_rollups')
+    for granularity, bucket_expr in ROLLUP_GRANULARITIES:
+        bucket = bucket_expr.format(alias='complaints')
+        conn.execute(
+            f"INSERT INTO complaint_rollups SELECT '{granularity}', {bucket}, 'all', '', COUNT(*) "
+            f"FROM complaints WHERE created_at IS NOT NULL GROUP BY {bucket}"
+        )
+        for column in ROLLUP_DIMENSIONS:
+            conn.execute(
+                f"INSERT INTO complaint_rollups SELECT '{granularity}', {bucket}, '{column}', "
+                f"COALESCE({column}, ''), COUNT(*) FROM complaints WHERE created_at IS NOT NULL "
+                f"GROUP BY {bucket}, COALESCE({column}, '')"
+            )
+
+
+def _backfill_phone_keys(conn: sqlite3.Connection):
+    """Fill phone_key for existing rows (normalization is done in Python)"""
+    rows = conn.execute(
+        "SELECT rowid, phone_number FROM complaints WHERE phone_number IS NOT NULL AND phone_number != ''"
+    ).fetchall()
+    conn.executemany(
+        'UPDATE complaints SET phone_key = ? WHERE rowid = ?',
+        [(normalize_phone(phone), rowid) for rowid, phone in rows]
+    )
+
+
+def _create_complaints_geo(conn: sqlite3.Connection):
+    """Create the complaints_geo R*Tree over complaint coordinates and backfill it"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS complaints_geo USING rtree(
+                id, min_lat, max_lat, min_lon, max_lon
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite built without R*Tree: nearby queries fall back to scanning
+        print(f"Spatial index unavailable: {e}")
+        return
+    
+    # One point box per located complaint, keyed by complaints.rowid
+    located = 'new.latitude IS NOT NULL AND new.longitude IS NOT NULL'
+    
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_geo_insert AFTER INSERT ON complaints
+        WHEN {located} BEGIN
+            INSERT OR REPLACE INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS complaints_geo_delete AFTER DELETE ON complaints BEGIN
+            DELETE FROM complaints_geo WHERE id = old.rowid;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS complaints_geo_update
+        AFTER UPDATE OF latitude, longitude ON complaints BEGIN
+            DELETE FROM complaints_geo WHERE id = old.rowid;
+            INSERT INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE {located};
+        END
+    ''')
+    
+    conn.execute('DELETE FROM complaints_geo')
+    conn.execute('''
+        INSERT INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT rowid, latitude, latitude, longitude, longitude FROM complaints
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    ''')
+
+
+# Ordered list of (version, description, steps). Never edit or reorder an
+# applied migration; append a new version instead.
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "Indexes for complaint filters, sorting and grouping", [
+        # Keyset pagination: ORDER BY created_at DESC, complaint_id DESC
+        'CREATE INDEX IF NOT EXISTS idx_complaints_created '
+        'ON complaints (created_at, complaint_id)',
+        # Filtered pages plus GROUP BY on the leading column (covering for COUNT)
+        'CREATE INDEX IF NOT EXISTS idx_complaints_status_created '
+        'ON complaints (status, created_at, complaint_id)',
+        'CREATE INDEX IF NOT EXISTS idx_complaints_type_created '
+        'ON complaints (complaint_type, created_at, complaint_id)',
+        'CREATE INDEX IF NOT EXISTS idx_complaints_zone_created '
+        'ON complaints (zone, created_at, complaint_id)',
+        'CREATE INDEX IF NOT EXISTS idx_complaints_ward_created '
+        'ON complaints (ward, created_at, complaint_id)',
+        'CREATE INDEX IF NOT EXISTS idx_complaints_updated '
+        'ON complaints (updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_complaints_phone '
+        'ON complaints (phone_number)',
+    ]),
+    (2, "Full-text search index over complaints", [
+        _create_complaints_fts,
+    ]),
+    (3, "Trigger-maintained complaint counters", [
+        _create_complaint_counters,
+    ]),
+    (4, "Sub-category column on complaints", [
+        "ALTER TABLE complaints ADD COLUMN sub_category TEXT DEFAULT ''",
+    ]),
+    (5, "Hourly and daily complaint rollups", [
+        _create_complaint_rollups,
+    ]),
+    (6, "Normalized phone key for caller lookups", [
+        "ALTER TABLE complaints ADD COLUMN phone_key TEXT DEFAULT ''",
+        _backfill_phone_keys,
+        # Caller history, newest first; replaces the raw phone_number index
+        'CREATE INDEX IF NOT EXISTS idx_complaints_phone_key '
+        'ON complaints (phone_key, created_at, complaint_id)',
+        'DROP INDEX IF EXISTS idx_complaints_phone',
+    ]),
+    (7, "Complaint coordinates and spatial index", [
+        'ALTER TABLE complaints ADD COLUMN latitude REAL',
+        'ALTER TABLE complaints ADD COLUMN longitude REAL',
+        _create_complaints_geo,
+    ]),
+    (8, "Per-scope complaint ID sequences", [
+        # scope is '<type code>-W<ward>-<YYYYMMDD>'; last_value is the highest
+        # sequence number handed out (in blocks) for that scope
+        'CREATE TABLE IF NOT EXISTS complaint_id_sequences ('
+        'scope TEXT PRIMARY KEY, last_value INTEGER NOT NULL) WITHOUT ROWID',
+    ]),
+    (9, "Compressed IVR call transcripts", [
+        # data is the zlib-compressed turn list of an ended IVR session
+        'CREATE TABLE IF NOT EXISTS ivr_transcripts ('
+        'session_id TEXT PRIMARY KEY, complaint_id TEXT, started_at TEXT, '
+        'ended_at TEXT, entries INTEGER NOT NULL, data BLOB NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS idx_ivr_transcripts_complaint '
+        'ON ivr_transcripts (complaint_id)',
+    ]),
+    (10, "Complaint counters per type and status", [
+        _create_type_status_counters,
+    ]),
+    (11, "Versioned complaint counters for delta reads", [
+        _version_complaint_counters,
+    ]),
+    (12, "Compressed history chunks of live IVR sessions", [
+        # data is the zlib-compressed list of entries turns spilled from a
+        # live session's history; seq numbers a session's chunks from 0
+        'CREATE TABLE IF NOT EXISTS ivr_history_chunks ('
+        'session_id TEXT NOT NULL, seq INTEGER NOT NULL, entries INTEGER NOT NULL, '
+        'data BLOB NOT NULL, PRIMARY KEY (session_id, seq)) WITHOUT ROWID',
+    ]),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the highest applied migration version (0 if none)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply every pending migration in version order
+
+    Each migration runs in its own IMMEDIATE transaction and the current
+    version is re-read after taking the write lock, so several processes
+    starting at once apply each migration exactly once.
+
+    Args:
+        conn: Open database connection
+
+    Returns:
+        List of versions applied by this call
+    """
+    applied = []
+
+    for version, description, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if get_schema_version(conn) >= version:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+
+            conn.execute(
+                'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                (version, description, datetime.now().isoformat())
+            )
+            conn.commit()
+            applied.append(version)
+        except Exception:
+            conn.rollback()
+            raise
+
+    return applied
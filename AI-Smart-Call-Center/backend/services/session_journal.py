@@ -0,0 +1,233 @@
+"""
+AI Smart Call Center - IVR Session Journal
+Append-only, fsync-batched log of IVR session writes for crash recovery
+"""
+
+import marshal
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Frame header: payload length and CRC32 of the payload
+_HEADER = struct.Struct('<II')
+
+OP_PUT = 1
+OP_DELETE = 2
+
+
+class SessionJournal:
+    """
+    Durable log of session puts and deletes
+
+    Each record is a length- and CRC-prefixed marshal frame holding
+    (op, session_id, wall-clock time, session). Appends only serialize
+    into a memory buffer; a background thread writes the buffer and
+    fsyncs every flush_interval_ms, so one fsync covers every turn in that
+    window. A crash can therefore lose at most the last window of turns.
+
+    replay() rebuilds the latest state of every session; a torn or corrupt
+    tail (crash mid-write) ends the replay and is cut off. compact()
+    rewrites the file as one put per live session.
+    """
+
+    def __init__(self, path: str, flush_interval_ms: float = 20.0):
+        self.path = path
+        self.flush_interval = flush_interval_ms / 1000
+
+        # (sequence number, frame) not yet written
+        self._pending: List[Tuple[int, bytes]] = []
+        self._lock = threading.Lock()
+        # Held for file I/O; compaction holds it throughout, so no flush
+        # can land in the file that is about to be replaced
+        self._io_lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+        # Metrics
+        self._records = 0
+        self._file_records = 0
+        self._bytes = 0
+        self._fsyncs = 0
+        self._compactions = 0
+
+    def _ensure_started(self):
+        """Start the flusher thread on first use"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="session-journal", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Session journal flush error: {e}")
+
+    @staticmethod
+    def _frame(op: int, session_id: str, timestamp: float, session: Optional[Dict]) -> bytes:
+        payload = marshal.dumps((op, session_id, timestamp, session))
+        return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _append(self, frame: bytes):
+        if self._stopped:
+            raise RuntimeError("Session journal is closed")
+        self._ensure_started()
+        with self._lock:
+            self._records += 1
+            self._pending.append((self._records, frame))
+
+    def frame_put(self, session_id: str, session: Dict, timestamp: float) -> bytes:
+        """Serialize a put record without appending it (for compact() snapshots)"""
+        return self._frame(OP_PUT, session_id, timestamp, session)
+
+    def append_put(self, session_id: str, session: Dict, timestamp: float = None):
+        """Record the current state of a session (serialized now)"""
+        self._append(self.frame_put(session_id, session, timestamp or time.time()))
+
+    def append_delete(self, session_id: str):
+        """Record that a session was removed"""
+        self._append(self._frame(OP_DELETE, session_id, time.time(), None))
+
+    def flush(self):
+        """Write and fsync everything appended so far"""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            data = b''.join(frame for _, frame in pending)
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file_records += len(pending)
+            self._bytes += len(data)
+            self._fsyncs += 1
+
+    def replay(self, budget_seconds: float = None) -> Tuple[Dict[str, Tuple[float, Dict]], Dict]:
+        """
+        Rebuild the latest state of every session from the file
+
+        Args:
+            budget_seconds: Stop reading after this long (None = no limit)
+
+        Returns:
+            (session_id -> (last write wall-clock time, session), replay stats)
+        """
+        started = time.perf_counter()
+        deadline = started + budget_seconds if budget_seconds is not None else None
+        sessions: Dict[str, Tuple[float, Dict]] = {}
+        records = 0
+        complete = True
+
+        with self._io_lock:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            position, end = 0, len(data)
+            header_size = _HEADER.size
+
+            while position + header_size <= end:
+                # Check the clock every 1024 records, not on every one
+                if deadline is not None and not records & 1023 and time.perf_counter() > deadline:
+                    complete = False
+                    break
+                length, crc = _HEADER.unpack_from(data, position)
+                payload = data[position + header_size:position + header_size + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                op, session_id, timestamp, session = marshal.loads(payload)
+                if op == OP_PUT:
+                    sessions[session_id] = (timestamp, session)
+                else:
+                    sessions.pop(session_id, None)
+                position += header_size + length
+                records += 1
+
+            torn = complete and position < end
+            if torn:
+                # Drop the partial frame so new appends start on a boundary
+                self._file.truncate(position)
+            self._file_records = records if complete else self._file_records + records
+
+        return sessions, {
+            'records': records,
+            'sessions': len(sessions),
+            'complete': complete,
+            'torn_tail_bytes': end - position if torn else 0,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last appended record"""
+        return self._records
+
+    def compact(self, snapshot: Callable[[], Tuple[int, List[bytes]]]) -> int:
+        """
+        Rewrite the journal as one put per live session
+
+        Args:
+            snapshot: Returns (sequence, frames) where frames holds one
+                frame_put() record per live session. Both must be taken
+                under the lock that guards the caller's sessions and
+                appends, so every session is serialized whole and no turn
+                can change it mid-marshal. It runs while nothing can reach
+                the file; buffered records up to sequence are superseded.
+
+        Returns:
+            Number of records in the compacted file
+        """
+        tmp_path = self.path + '.compact'
+        with self._io_lock:
+            upto, frames = snapshot()
+            with self._lock:
+                self._pending = [item for item in self._pending if item[0] > upto]
+
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(frames))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'ab')
+            self._file_records = len(frames)
+            self._compactions += 1
+        return len(frames)
+
+    @property
+    def file_records(self) -> int:
+        """Records currently in the file (excluding unflushed ones)"""
+        return self._file_records
+
+    def close(self):
+        """Flush outstanding records and stop the flusher"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        self._file.close()
+
+    def get_metrics(self) -> Dict:
+        """Snapshot of journal counters"""
+        with self._lock:
+            return {
+                'path': self.path,
+                'records_appended': self._records,
+                'records_in_file': self._file_records,
+                'pending': len(self._pending),
+                'bytes_written': self._bytes,
+                'fsyncs': self._fsyncs,
+                'compactions': self._compactions
+            }
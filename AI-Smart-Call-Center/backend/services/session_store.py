@@ -0,0 +1,535 @@
+"""
+AI Smart Call Center - IVR Session Store
+Bounded storage for live IVR sessions with idle expiry and a background sweeper,
+either in process memory or in a SQLite table shared by every worker
+"""
+
+import asyncio
+import marshal
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.connection_pool import ConnectionPool
+from services.session_journal import SessionJournal
+
+
+class SessionConflictError(Exception):
+    """Raised when a session was changed (or removed) since it was read"""
+
+
+class SessionStore:
+    """
+    Interface for IVR session storage
+
+    Subclasses implement get/put/delete/sweep/get_metrics; the periodic
+    asyncio sweeper that calls sweep() is shared.
+
+    Writes are optimistic: get() sets session["version"], and put() only
+    succeeds if the stored session still has that version (or, for a
+    session without one, if the ID is not taken yet). Otherwise it raises
+    SessionConflictError and the caller should re-read and retry.
+
+    on_remove, if set, is called with every session that leaves the store
+    (deleted, expired or evicted), outside any store lock, e.g. to keep
+    its transcript.
+    """
+
+    def __init__(self, sweep_interval: float = 30.0):
+        self.sweep_interval = sweep_interval
+        self.on_remove: Optional[Callable[[Dict], None]] = None
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _removed(self, sessions: Iterable[Dict]):
+        """Hand removed sessions to on_remove"""
+        if self.on_remove is None:
+            return
+        for session in sessions:
+            try:
+                self.on_remove(session)
+            except Exception as e:
+                print(f"Session removal hook error: {e}")
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Get a live session (None if missing or expired)"""
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: Dict):
+        """Store a session, bump its version and refresh its idle timer"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session; True if it existed"""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Remove every expired session; returns how many were removed"""
+        raise NotImplementedError
+
+    def get_metrics(self) -> Dict:
+        """Snapshot of session counters"""
+        raise NotImplementedError
+
+    def recover(self, budget_seconds: float = None) -> Dict:
+        """Restore sessions that were live before a restart; returns recovery stats"""
+        return {}
+
+    def close(self):
+        """Release files and connections"""
+
+    async def _sweep_forever(self):
+        """Sweep every sweep_interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # Off the event loop: sweeping may write removed sessions out
+                await asyncio.get_running_loop().run_in_executor(None, self.sweep)
+            except Exception as e:
+                print(f"Session sweep error: {e}")
+
+    def start_sweeper(self):
+        """Start the background sweeper on the running event loop (idempotent)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+
+    async def stop_sweeper(self):
+        """Cancel the background sweeper and wait for it to finish"""
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store with idle TTL and LRU eviction
+
+    Sessions are kept in access order, so the least recently used session
+    is always first: eviction pops from the front, and a sweep stops at
+    the first session that has not yet expired instead of scanning all.
+
+    get() returns a copy of the stored session and put() stores a copy (a
+    marshal round-trip, as the SQLite store does), so no caller shares a
+    dict with the store: two turns that read the same version hold
+    separate dicts and the later put() raises SessionConflictError, and
+    changes made after put() never reach the store without a new version.
+
+    With a journal, every put and removal is also logged so recover() can
+    rebuild the live sessions after a restart, and sweep() compacts the
+    journal once it holds compact_ratio times more records than there are
+    live sessions.
+
+    Example:
+        store = InMemorySessionStore(ttl_seconds=600, max_sessions=5000)
+        store.put(session["session_id"], session)
+        store.get(session["session_id"])  # refreshes the idle timer
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 900.0,
+        max_sessions: int = 10000,
+        sweep_interval: float = 30.0,
+        journal: Optional[SessionJournal] = None,
+        compact_ratio: float = 4.0
+    ):
+        super().__init__(sweep_interval)
+        self.ttl = ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self.journal = journal
+        self.compact_ratio = compact_ratio
+        # session_id -> (last access on the monotonic clock, session)
+        self._sessions: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._created = 0
+        self._conflicts = 0
+        self._expirations = 0
+        self._evictions = 0
+        self._sweeps = 0
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expired = now - entry[0] > self.ttl
+            if expired:
+                del self._sessions[session_id]
+                self._expirations += 1
+                if self.journal is not None:
+                    self.journal.append_delete(session_id)
+            else:
+                self._sessions[session_id] = (now, entry[1])
+                self._sessions.move_to_end(session_id)
+                return marshal.loads(marshal.dumps(entry[1]))
+        self._removed([entry[1]])
+        return None
+
+    def put(self, session_id: str, session: Dict):
+        now = time.monotonic()
+        expected = session.get('version')
+        evicted = []
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                if expected is not None:
+                    self._conflicts += 1
+                    raise SessionConflictError(f"Session {session_id} no longer exists")
+                self._created += 1
+            elif entry[1].get('version') != expected:
+                self._conflicts += 1
+                raise SessionConflictError(f"Session {session_id} was changed concurrently")
+            session['version'] = (expected or 0) + 1
+            self._sessions[session_id] = (now, marshal.loads(marshal.dumps(session)))
+            self._sessions.move_to_end(session_id)
+            if self.journal is not None:
+                self.journal.append_put(session_id, session)
+            while len(self._sessions) > self.max_sessions:
+                evicted_id, (_, evicted_session) = self._sessions.popitem(last=False)
+                evicted.append(evicted_session)
+                self._evictions += 1
+                if self.journal is not None:
+                    self.journal.append_delete(evicted_id)
+        self._removed(evicted)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None and self.journal is not None:
+                self.journal.append_delete(session_id)
+        if entry is None:
+            return False
+        self._removed([entry[1]])
+        return True
+
+    def sweep(self) -> int:
+        cutoff = time.monotonic() - self.ttl
+        expired = []
+        with self._lock:
+            while self._sessions:
+                session_id, (last_access, session) = next(iter(self._sessions.items()))
+                if last_access >= cutoff:
+                    break
+                del self._sessions[session_id]
+                expired.append(session)
+                if self.journal is not None:
+                    self.journal.append_delete(session_id)
+            self._expirations += len(expired)
+            self._sweeps += 1
+        self._removed(expired)
+
+        if self.journal is not None and (
+            self.journal.file_records > self.compact_ratio * max(len(self._sessions), 1000)
+        ):
+            self.journal.compact(self._snapshot)
+        return len(expired)
+
+    def _snapshot(self) -> Tuple[int, List[bytes]]:
+        """Journal sequence and a put frame per live session, serialized under the store lock"""
+        with self._lock:
+            wall_offset = time.time() - time.monotonic()
+            return self.journal.sequence, [
+                self.journal.frame_put(session_id, session, last_access + wall_offset)
+                for session_id, (last_access, session) in self._sessions.items()
+            ]
+
+    def recover(self, budget_seconds: float = None) -> Dict:
+        """
+        Rebuild live sessions from the journal
+
+        Sessions idle longer than the TTL are skipped, and the most recent
+        max_sessions are kept in their original access order. If the time
+        budget runs out, the sessions read so far are restored.
+        """
+        if self.journal is None:
+            return {}
+        sessions, stats = self.journal.replay(budget_seconds)
+
+        cutoff = time.time() - self.ttl
+        live = sorted(
+            ((ts, session_id, session) for session_id, (ts, session) in sessions.items() if ts >= cutoff),
+            key=lambda item: item[0]
+        )[-self.max_sessions:]
+        mono_offset = time.monotonic() - time.time()
+        with self._lock:
+            for ts, session_id, session in live:
+                if session_id not in self._sessions:
+                    self._sessions[session_id] = (ts + mono_offset, session)
+        stats['recovered'] = len(live)
+        return stats
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'live_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'ttl_seconds': self.ttl,
+                'created': self._created,
+                'conflicts': self._conflicts,
+                'expirations': self._expirations,
+                'evictions': self._evictions,
+                'sweeps': self._sweeps,
+                'journal': self.journal.get_metrics() if self.journal is not None else None
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store in a SQLite WAL table, shared by every worker process
+
+    Each session is one row holding its version, its last write time and
+    the session dict serialized with marshal (compact, and much faster
+    than JSON for these small dicts of str / int / list / dict). All
+    workers must run the same Python version. Reads do not write:
+    the idle timer restarts on put(), i.e. on every IVR turn. The size
+    cap is applied by sweep(), which evicts the least recently written
+    sessions, so it may be exceeded by one sweep interval's arrivals.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "ivr_sessions.db",
+        ttl_seconds: float = 900.0,
+        max_sessions: int = 10000,
+        sweep_interval: float = 30.0,
+        pool_size: int = 5
+    ):
+        super().__init__(sweep_interval)
+        self.db_path = db_path
+        self.ttl = ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self.pool = ConnectionPool(db_path, pool_size=pool_size, cache_size_kb=4096)
+        with self.pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ivr_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    data BLOB NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_ivr_sessions_last_access '
+                'ON ivr_sessions (last_access)'
+            )
+            conn.commit()
+
+        # Metrics (this process only; live_sessions is read from the table)
+        self._created = 0
+        self._conflicts = 0
+        self._expirations = 0
+        self._evictions = 0
+        self._sweeps = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT version, last_access, data FROM ivr_sessions WHERE session_id = ?',
+                (session_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        session = marshal.loads(row[2])
+        session['version'] = row[0]
+        return session
+
+    def put(self, session_id: str, session: Dict):
+        expected = session.get('version')
+        session['version'] = version = (expected or 0) + 1
+        data = marshal.dumps(session)
+        now = time.time()
+
+        with self.pool.connection() as conn:
+            if expected is None:
+                try:
+                    conn.execute(
+                        'INSERT INTO ivr_sessions (session_id, version, last_access, data) '
+                        'VALUES (?, ?, ?, ?)',
+                        (session_id, version, now, data)
+                    )
+                except sqlite3.IntegrityError:
+                    updated = 0
+                else:
+                    updated = 1
+            else:
+                updated = conn.execute(
+                    'UPDATE ivr_sessions SET version = ?, last_access = ?, data = ? '
+                    'WHERE session_id = ? AND version = ?',
+                    (version, now, data, session_id, expected)
+                ).rowcount
+            conn.commit()
+
+        if not updated:
+            session['version'] = expected
+            self._count('_conflicts')
+            raise SessionConflictError(f"Session {session_id} was changed concurrently")
+        if expected is None:
+            self._count('_created')
+
+    def delete(self, session_id: str) -> bool:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                'DELETE FROM ivr_sessions WHERE session_id = ? RETURNING data', (session_id,)
+            ).fetchall()
+            conn.commit()
+        self._removed(marshal.loads(row[0]) for row in rows)
+        return bool(rows)
+
+    def sweep(self) -> int:
+        # Removed rows come back through RETURNING (whole sessions only for on_remove)
+        returning = ' RETURNING data' if self.on_remove is not None else ' RETURNING session_id'
+        with self.pool.connection() as conn:
+            expired = conn.execute(
+                'DELETE FROM ivr_sessions WHERE last_access < ?' + returning,
+                (time.time() - self.ttl,)
+            ).fetchall()
+            excess = conn.execute('SELECT COUNT(*) FROM ivr_sessions').fetchone()[0] - self.max_sessions
+            evicted = []
+            if excess > 0:
+                evicted = conn.execute(
+                    'DELETE FROM ivr_sessions WHERE session_id IN ('
+                    'SELECT session_id FROM ivr_sessions ORDER BY last_access LIMIT ?)' + returning,
+                    (excess,)
+                ).fetchall()
+            conn.commit()
+
+        with self._lock:
+            self._expirations += len(expired)
+            self._evictions += len(evicted)
+            self._sweeps += 1
+        self._removed(marshal.loads(row[0]) for row in expired + evicted)
+        return len(expired) + len(evicted)
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM ivr_sessions').fetchone()[0]
+
+    def get_metrics(self) -> Dict:
+        live = len(self)
+        with self._lock:
+            return {
+                'backend': 'sqlite',
+                'live_sessions': live,
+                'max_sessions': self.max_sessions,
+                'ttl_seconds': self.ttl,
+                'created': self._created,
+                'conflicts': self._conflicts,
+                'expirations': self._expirations,
+                'evictions': self._evictions,
+                'sweeps': self._sweeps
+            }
+
+    def close(self):
+        """Close the pooled connections"""
+        self.pool.close()
+
+
+class SessionLocks:
+    """
+    Per-session asyncio locks so one session's turns run one at a time
+
+    asyncio.Lock wakes waiters in arrival order, so turns are applied in
+    the order their requests reached this worker. A lock exists only
+    while someone holds or waits for it. Must be used from a single event
+    loop. The locks only order turns; lost updates are prevented by the
+    store's version check, which also covers writers outside the lock and
+    turns for the same session on other workers.
+
+    Example:
+        async with session_locks.hold(session_id):
+            ...  # read, update and write the session
+    """
+
+    def __init__(self):
+        # session_id -> [lock, number of holders and waiters]
+        self._locks: Dict[str, List] = {}
+        self._contended = 0
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        elif entry[0].locked():
+            self._contended += 1
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+    def get_metrics(self) -> Dict:
+        """Number of sessions with a turn in flight and how often a turn had to wait"""
+        return {
+            'active_locks': len(self._locks),
+            'contended_turns': self._contended
+        }
+
+
+def create_session_store(backend: str = "sqlite", **options) -> SessionStore:
+    """
+    Build a session store by backend name
+
+    Args:
+        backend: 'sqlite' (shared by all workers) or 'memory' (one process only)
+        options: Constructor arguments for the chosen store, plus journal_path
+            and journal_flush_ms for the memory store (an empty path means no
+            journal; the SQLite store is durable by itself)
+    """
+    journal_path = options.pop("journal_path", None)
+    journal_flush_ms = options.pop("journal_flush_ms", 20.0)
+    if backend == "memory":
+        options.pop("db_path", None)
+        if journal_path:
+            options["journal"] = SessionJournal(journal_path, journal_flush_ms)
+        return InMemorySessionStore(**options)
+    if backend == "sqlite":
+        return SQLiteSessionStore(**options)
+    raise ValueError(f"Unknown IVR session backend: {backend}")
+
+
+# Singleton instance; the SQLite backend lets uvicorn run several workers
+session_store = create_session_store(
+    os.getenv("IVR_SESSION_BACKEND", "sqlite"),
+    db_path=os.getenv("IVR_SESSION_DB", "ivr_sessions.db"),
+    journal_path=os.getenv("IVR_SESSION_JOURNAL", "ivr_sessions.journal"),
+    journal_flush_ms=float(os.getenv("IVR_SESSION_JOURNAL_FLUSH_MS", "20")),
+    ttl_seconds=float(os.getenv("IVR_SESSION_TTL_SECONDS", "900")),
+    max_sessions=int(os.getenv("IVR_MAX_SESSIONS", "10000")),
+    sweep_interval=float(os.getenv("IVR_SESSION_SWEEP_SECONDS", "30"))
+)
+
+
+def get_session_store() -> SessionStore:
+    """Get the IVR session store instance"""
+    return session_store
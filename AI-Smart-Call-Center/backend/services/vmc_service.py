@@ -624,26 +624,15 @@ class VMCService:
         """
         Generate VMC-style complaint ID
         
-        Format: VMC-{TYPE}-{WARD}-{TIMESTAMP}
+        Format: VMC-{TYPE}-{WARD}-{DATE}-{SEQ}
         Example: VMC-SL-W01-20260121-001
-        """
-        import random
-        
-        type_id = self.complaint_categories.get(complaint_type, {}).get('id', 'OT')
         
-        # Extract ward number
-        ward_num = '00'
-        if ward:
-            import re
-            match = re.search(r'\d+', ward)
-            if match:
-                ward_num = match.group().zfill(2)
-        
-        # Date and sequence
-        date_str = datetime.now().strftime('%Y%m%d')
-        seq = str(random.randint(1, 999)).zfill(3)
+        The sequence comes from the shared allocator, so IDs are unique
+        across processes and increase within a ward, type and day.
+        """
+        from utils.id_generator import generate_complaint_id
         
-        return f"VMC-{type_id}-W{ward_num}-{date_str}-{seq}"
+        return generate_complaint_id(complaint_type, ward)
     
     def get_priority(self, complaint_type: str, sub_category: str = None) -> str:
         """
@@ -11,7 +11,7 @@ import asyncio
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from services.database_service import get_db_service
-from services.complaint_service import get_complaint_service
+from services.complaint_repository import get_complaint_repository
 
 def initialize_database():
     """Initialize the database with required tables"""
@@ -24,6 +24,7 @@ def initialize_database():
         print("✓ Database service initialized")
         print("✓ Complaints table created/verified")
         print("✓ Ward-Zone mapping table created/verified")
+        print(f"✓ Schema migrations applied (version {db_service.get_schema_version()})")
         print("✓ Sample data loaded")
         return True
     except Exception as e:
@@ -46,8 +47,24 @@ def initialize_services():
         tts_service = TTSService()
         print("✓ Text-to-Speech Service initialized")
         
-        complaint_service = get_complaint_service()
-        print("✓ Complaint Service initialized")
+        complaint_repository = get_complaint_repository()
+        print(f"✓ Complaint Repository initialized (hot set: {complaint_repository.open_cache.max_entries} open, "
+              f"{complaint_repository.closed_cache.max_entries} closed complaints)")
+        
+        # A cold hot set only costs a few slower first lookups, so a failed
+        # warm start is reported but does not stop the server
+        try:
+            warm = asyncio.run(complaint_repository.warm_start())
+            print(f"✓ Complaint hot set warm-started: {warm['rows']} open complaints "
+                  f"in {warm['seconds']}s ({warm['rows_per_second']} rows/s)")
+        except Exception as e:
+            print(f"⚠ Complaint hot set warm start skipped: {e}")
+        
+        # Compiled (and validated) when the controller is created
+        from services.ivr_controller import get_ivr_controller
+        flow = get_ivr_controller().flow.get_summary()
+        print(f"✓ IVR flow '{flow['name']}' compiled: {flow['states']} states, "
+              f"{flow['transitions']} transitions")
         
         return True
     except Exception as e:
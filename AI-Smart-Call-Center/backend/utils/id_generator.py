@@ -1,22 +1,22 @@
 """
 AI Smart Call Center - ID Generator Utility
-Generates unique complaint IDs
+Generates unique complaint IDs, session IDs and short reference codes
 """
 
 import random
+import secrets
 import string
-from datetime import datetime
 
 
-def generate_complaint_id():
+def generate_complaint_id(complaint_type: str = 'Other', ward: str = ''):
     """
-    Generate a unique complaint ID
-    Format: COMP-YYYYMMDDHHMMSS-XXXXXXXX
-    Example: COMP-20260121083045-A1B2C3D4
+    Generate a unique complaint ID from the shared sequence allocator
+    Format: VMC-{TYPE}-W{WARD}-{YYYYMMDD}-{SEQ}
+    Example: VMC-SL-W01-20260121-001
     """
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    random_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-    return f"COMP-{timestamp}-{random_suffix}"
+    # Imported here: the allocator needs the database service
+    from services.id_allocator import get_id_allocator
+    return get_id_allocator().allocate(complaint_type, ward)
 
 
 def generate_short_id(length=6):
@@ -27,6 +27,14 @@ def generate_short_id(length=6):
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
 
+def generate_session_id():
+    """
+    Generate an unguessable IVR session ID (128 random bits, URL-safe)
+    Example: 3q2-7wEjRZyGk1xT0bq9mA
+    """
+    return secrets.token_urlsafe(16)
+
+
 def generate_reference_number():
     """
     Generate a reference number for tracking
@@ -40,5 +48,6 @@ def generate_reference_number():
 if __name__ == "__main__":
     # Test ID generation
     print("Generated Complaint ID:", generate_complaint_id())
+    print("Generated Session ID:", generate_session_id())
     print("Generated Short ID:", generate_short_id())
     print("Generated Reference:", generate_reference_number())
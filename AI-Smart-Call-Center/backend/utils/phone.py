@@ -0,0 +1,52 @@
+"""
+AI Smart Call Center - Phone Number Utility
+Normalizes caller phone numbers into a single lookup key
+"""
+
+import re
+
+
+INDIA_COUNTRY_CODE = "91"
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Normalize a phone number to E.164 (+91XXXXXXXXXX for Indian numbers)
+
+    Spaces, dashes, dots and brackets are ignored, and the +91 / 91 / 0
+    prefixes are stripped before the national number is re-prefixed, so
+    "98765 43210", "+91-9876543210" and "09876543210" all give the same key.
+    Numbers entered with another country code keep it.
+
+    Args:
+        phone: Phone number as typed or spoken
+
+    Returns:
+        E.164 string, or '' if the input is not a usable phone number
+    """
+    if not phone:
+        return ''
+
+    text = phone.strip()
+    digits = re.sub(r'\D', '', text)
+
+    if text.startswith('+') or text.startswith('00'):
+        if text.startswith('00'):
+            digits = digits[2:]
+        if digits.startswith(INDIA_COUNTRY_CODE) and len(digits) == 12:
+            return f"+{digits}"
+        return f"+{digits}" if 8 <= len(digits) <= 15 else ''
+
+    if len(digits) == 12 and digits.startswith(INDIA_COUNTRY_CODE):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+
+    if len(digits) != 10:
+        return ''
+    return f"+{INDIA_COUNTRY_CODE}{digits}"
+
+
+if __name__ == "__main__":
+    for sample in ["98765 43210", "+91-9876543210", "09876543210", "919876543210", "+1 415 555 0100", "123"]:
+        print(f"{sample!r:>20} -> {normalize_phone(sample)!r}")
@@ -2,8 +2,13 @@
 // API Configuration
 const API_BASE_URL = 'http://localhost:5000/api';
 
+// GET /complaints returns one page at a time (newest first); the server caps pages at 500
+const PAGE_SIZE = 100;
+const MAX_PAGE_SIZE = 500;
+
 let allComplaints = [];
 let filteredComplaints = [];
+let nextCursor = null;
 
 // Initialize dashboard
 document.addEventListener('DOMContentLoaded', () => {
@@ -18,13 +23,15 @@ function setupEventListeners() {
     const statusFilter = document.getElementById('statusFilter');
     const categoryFilter = document.getElementById('categoryFilter');
     const refreshBtn = document.getElementById('refreshBtn');
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
 
     if (searchInput) {
         searchInput.addEventListener('input', filterComplaints);
     }
 
     if (statusFilter) {
-        statusFilter.addEventListener('change', filterComplaints);
+        // Status is filtered by the server, so pages hold only matching rows
+        statusFilter.addEventListener('change', () => loadComplaints());
     }
 
     if (categoryFilter) {
@@ -36,6 +43,10 @@ function setupEventListeners() {
             loadComplaints();
         });
     }
+
+    if (loadMoreBtn) {
+        loadMoreBtn.addEventListener('click', loadMoreComplaints);
+    }
 }
 
 // Setup auto-refresh every 30 seconds
@@ -45,24 +56,42 @@ function setupAutoRefresh() {
     }, 30000);
 }
 
-// Load all complaints from API
+// URL of one page of complaints
+function complaintsPageUrl(cursor, limit = PAGE_SIZE) {
+    const params = new URLSearchParams({ limit: String(limit) });
+    const status = document.getElementById('statusFilter').value;
+    if (status) params.set('status', status);
+    if (cursor) params.set('cursor', cursor);
+    return `${API_BASE_URL}/complaints?${params}`;
+}
+
+// Load the first page of complaints and the statistics counters
 async function loadComplaints(silent = false) {
     try {
-        const response = await fetch(`${API_BASE_URL}/complaints`);
-
-        if (!response.ok) {
+        // A silent refresh keeps as many rows on screen as were already loaded
+        const limit = silent
+            ? Math.min(Math.max(allComplaints.length, PAGE_SIZE), MAX_PAGE_SIZE)
+            : PAGE_SIZE;
+        const [listResponse, statsResponse] = await Promise.all([
+            fetch(complaintsPageUrl(null, limit)),
+            fetch(`${API_BASE_URL}/complaints/stats/summary`)
+        ]);
+
+        if (!listResponse.ok || !statsResponse.ok) {
             throw new Error('Failed to fetch complaints');
         }
 
-        const data = await response.json();
+        const data = await listResponse.json();
+        const stats = await statsResponse.json();
         allComplaints = data.data || [];
+        nextCursor = data.next_cursor || null;
         filteredComplaints = [...allComplaints];
 
-        updateStatistics();
+        updateStatistics(stats.data);
         filterComplaints();
 
         if (!silent) {
-            console.log(`Loaded ${allComplaints.length} complaints`);
+            console.log(`Loaded ${allComplaints.length} of ${stats.data.total} complaints`);
         }
 
     } catch (error) {
@@ -71,17 +100,37 @@ async function loadComplaints(silent = false) {
     }
 }
 
-// Update statistics cards
-function updateStatistics() {
-    const total = allComplaints.length;
-    const pending = allComplaints.filter(c => c.status === 'pending').length;
-    const inProgress = allComplaints.filter(c => c.status === 'in_progress').length;
-    const resolved = allComplaints.filter(c => c.status === 'resolved').length;
-
-    document.getElementById('totalComplaints').textContent = total;
-    document.getElementById('pendingComplaints').textContent = pending;
-    document.getElementById('inProgressComplaints').textContent = inProgress;
-    document.getElementById('resolvedComplaints').textContent = resolved;
+// Append the next page of complaints
+async function loadMoreComplaints() {
+    if (!nextCursor) return;
+
+    try {
+        const response = await fetch(complaintsPageUrl(nextCursor));
+
+        if (!response.ok) {
+            throw new Error('Failed to fetch complaints');
+        }
+
+        const data = await response.json();
+        allComplaints = allComplaints.concat(data.data || []);
+        nextCursor = data.next_cursor || null;
+
+        filterComplaints();
+
+    } catch (error) {
+        console.error('Error loading more complaints:', error);
+        showError('Failed to load complaints. Please try again.');
+    }
+}
+
+// Update statistics cards from the server counters (every complaint, not just loaded pages)
+function updateStatistics(stats) {
+    const byStatus = stats.by_status || {};
+
+    document.getElementById('totalComplaints').textContent = stats.total || 0;
+    document.getElementById('pendingComplaints').textContent = byStatus.pending || 0;
+    document.getElementById('inProgressComplaints').textContent = byStatus.in_progress || 0;
+    document.getElementById('resolvedComplaints').textContent = byStatus.resolved || 0;
 }
 
 // Filter complaints based on search and filters
@@ -114,6 +163,9 @@ function filterComplaints() {
 function renderComplaintsTable() {
     const tbody = document.getElementById('complaintsTableBody');
     const emptyState = document.getElementById('emptyState');
+    const loadMore = document.getElementById('loadMoreContainer');
+
+    if (loadMore) loadMore.style.display = nextCursor ? 'block' : 'none';
 
     if (filteredComplaints.length === 0) {
         tbody.innerHTML = '';
@@ -227,12 +227,12 @@ function initMobileNav() {
     }
 }
 
-// Load real data from backend
+// Load real data from backend (counters only, however many complaints exist)
 async function loadLandingPageData() {
     try {
         console.log('[Landing] Loading data from backend...');
 
-        const response = await fetch('http://localhost:5000/api/complaints');
+        const response = await fetch('http://localhost:5000/api/complaints/stats/summary');
 
         if (response.ok) {
             const data = await response.json();
@@ -250,10 +250,11 @@ async function loadLandingPageData() {
 }
 
 // Update statistics on the page
-function updateLandingStats(complaints) {
-    const totalComplaints = complaints.length;
-    const resolvedComplaints = complaints.filter(c => c.status === 'resolved').length;
-    const pendingComplaints = complaints.filter(c => c.status === 'pending' || c.status === 'in_progress').length;
+function updateLandingStats(stats) {
+    const byStatus = stats.by_status || {};
+    const totalComplaints = stats.total || 0;
+    const resolvedComplaints = byStatus.resolved || 0;
+    const pendingComplaints = (byStatus.pending || 0) + (byStatus.in_progress || 0);
 
     const totalEl = document.getElementById('totalComplaints');
     const resolvedEl = document.getElementById('resolvedComplaints');
@@ -267,20 +268,18 @@ function updateLandingStats(complaints) {
 }
 
 // Update chart with real data
-function updateChartData(complaints) {
+function updateChartData(stats) {
     if (!window.complaintsChartInstance) return;
 
-    // Aggregate complaints by type
+    // Complaints and resolved complaints by type, from the server counters
     const complaintsByType = {};
     const resolvedByType = {};
 
-    complaints.forEach(complaint => {
-        const type = complaint.complaint_type || 'Other';
-        complaintsByType[type] = (complaintsByType[type] || 0) + 1;
-
-        if (complaint.status === 'resolved') {
-            resolvedByType[type] = (resolvedByType[type] || 0) + 1;
-        }
+    Object.entries(stats.by_type || {}).forEach(([type, count]) => {
+        const key = type || 'Other';
+        complaintsByType[key] = (complaintsByType[key] || 0) + count;
+        resolvedByType[key] = (resolvedByType[key] || 0) +
+            (((stats.by_type_status || {})[type] || {}).resolved || 0);
     });
 
     const types = Object.keys(complaintsByType);